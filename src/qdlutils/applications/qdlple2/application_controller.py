@@ -11,10 +11,121 @@ from qdlutils.hardware.wavemeters.wavemeters import WavemeterController
 from qdlutils.experiments.controllers.sequencecontrollerbase import SequenceControllerBase
 
 from typing import Union, Any, Callable
-from threading import Thread
+from threading import Lock, Thread
 
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+
+
+# Reductions over the last axis of the data for each of the processing instructions. The result is
+# written into the provided `out` array.
+_REDUCERS = {
+    'first': lambda samples, out: np.copyto(out, samples[...,0]),
+    'last': lambda samples, out: np.copyto(out, samples[...,-1]),
+    'sum': lambda samples, out: np.sum(samples, axis=-1, out=out),
+    'average': lambda samples, out: np.mean(samples, axis=-1, out=out),
+}
+
+
+def _get_reducer(
+        instruction: str
+) -> Callable:
+    '''
+    Returns the reduction for the provided processing `instruction`.
+    '''
+    try:
+        return _REDUCERS[instruction]
+    except KeyError:
+        raise ValueError(f'Instruction {instruction} invalid.')
+
+
+def _reduced_dtype(
+        dtype: np.dtype,
+        instruction: str
+) -> np.dtype:
+    '''
+    Returns the data type resulting from reducing samples of type `dtype` according to the
+    `instruction`, matching the default behavior of `np.sum()` and `np.mean()`.
+    '''
+    if instruction == 'sum':
+        return np.sum(np.zeros(1, dtype=dtype)).dtype
+    if instruction == 'average':
+        return np.mean(np.zeros(1, dtype=dtype)).dtype
+    return np.dtype(dtype)
+
+
+def _reduce_samples(
+        samples: np.ndarray,
+        n_pixels: int,
+        n_subpixels: int,
+        cycles_per_subpixel: int,
+        instruction: str,
+        subpixel_out: np.ndarray,
+        pixel_out: np.ndarray
+) -> None:
+    '''
+    Reduces a segment of raw samples recorded at the clock rate to values at the subpixels and
+    pixels, writing the results into `subpixel_out` and `pixel_out` respectively. The samples are
+    viewed as a `(n_pixels, n_subpixels, cycles_per_subpixel)` array so that the raw data is only
+    read once; the pixel values are then obtained from the (much smaller) subpixel values.
+
+    Options for `instruction`:
+        (1) `'sum'`: report the sum of the samples
+        (2) `'average'`: average the samples
+        (3) `'first'`: report the first sample
+        (4) `'last'`: report the last sample
+    '''
+    reducer = _get_reducer(instruction)
+    # View the subpixel output as 2-d so that the pixels can be reduced from it directly.
+    subpixel_out = subpixel_out.reshape(n_pixels, n_subpixels)
+    # Since there are an equal number of samples per subpixel, applying the reduction to the
+    # subpixel values yields the same result as applying it to all of the samples in a pixel.
+    reducer(samples.reshape(n_pixels, n_subpixels, cycles_per_subpixel), subpixel_out)
+    reducer(subpixel_out, pixel_out)
+
+
+def _validate_scan_parameters(
+        n_pixels_up: int,
+        n_pixels_down: int,
+        n_subpixels: int,
+        time_up: float,
+        time_down: float,
+        time_repump: float
+) -> None:
+    '''
+    Checks that the pixel numbers are positive integers and that the scan times are valid, raising
+    a `ValueError` otherwise.
+    '''
+    # Check if pixel numbers are positive integers
+    for description, n in (
+            ('# pixels up', n_pixels_up),
+            ('# pixels down', n_pixels_down),
+            ('# subpixels', n_subpixels)
+    ):
+        if type(n) is not int or n < 1:
+            raise ValueError(f'Requested {description} {n} is invalid (must be at least 1).')
+    # Check that up/downscan times are greater than zero.
+    if not (time_up > 0):
+        raise ValueError(f'Requested upsweep time {time_up}s is invalid (must be > 0).')
+    if not (time_down > 0):
+        raise ValueError(f'Requested downsweep time {time_down}s is invalid (must be > 0).')
+    # Check if repump time is nonzero
+    if time_repump < 0:
+        raise ValueError(f'Requested repump time {time_repump} is invalid (must be non-negative).')
+
+
+def _validate_process_instructions(
+        process_instructions: dict[str,str],
+        valid_instructions: tuple[str, ...]
+) -> None:
+    '''
+    Checks that every processing instruction is supported by the controller. This is performed when
+    the controller is constructed so that an invalid instruction is caught before any data is
+    acquired rather than after the first sequence has been run.
+    '''
+    for name, instruction in process_instructions.items():
+        if instruction not in valid_instructions:
+            raise ValueError(f'Instruction {instruction} for {name} invalid.')
+
 
 class PLEControllerBase(SequenceControllerBase):
 
@@ -36,6 +147,10 @@ class PLEControllerBase(SequenceControllerBase):
         )
         self.scan_laser_id = scan_laser_id
         self.clock_rate = clock_rate
+        _validate_process_instructions(
+            process_instructions=process_instructions,
+            valid_instructions=tuple(_REDUCERS)
+        )
         self.process_instructions = process_instructions
 
 
@@ -97,6 +212,15 @@ class PLEControllerPulsedRepumpContinuous(PLEControllerBase):
         self.n_samples_scan = None
         self.n_samples_total = None
 
+        # Output datastream buffers, reused between configurations with the same number of samples
+        self.scan_laser_output_buffer = None
+        self.repump_laser_output_buffer = None
+        # Subpixel values of the scan laser, reused between configurations with the same scan range
+        # and number of subpixels
+        self.subpixel_values_up = None
+        self.subpixel_values_down = None
+        self.subpixel_values_key = None
+
     def configure_sequence(
             self,
             min,
@@ -137,25 +261,19 @@ class PLEControllerPulsedRepumpContinuous(PLEControllerBase):
 
         # Check if the max > min and both are within the scan laser's range
         if max > min:
-            self.outputs[self.scan_laser_id]._validate_data(data=min)
-            self.outputs[self.scan_laser_id]._validate_data(data=min)
+            self.sequencer.validate_output_data(output_name=self.scan_laser_id,data=min)
+            self.sequencer.validate_output_data(output_name=self.scan_laser_id,data=max)
         else:
             raise ValueError(f'Requested max {max:.3f} is less than min {min:.3f}.')
-        # Check if pixel numbers are positive integers
-        if type(n_pixels_up) is not int or n_pixels_up < 1:
-            raise ValueError(f'Requested # pixels up {n_pixels_up} is invalid (must be at least 1).')
-        if type(n_pixels_down) is not int or n_pixels_down < 1:
-            raise ValueError(f'Requested # pixels down {n_pixels_down} is invalid (must be at least 1).')
-        if type(n_subpixels) is not int or n_subpixels < 1:
-            raise ValueError(f'Requested # subpixels {n_subpixels} is invalid (must be at least 1).')
-        # Check that up/downscan times are greater than zero.
-        if not (time_up > 0):
-            raise ValueError(f'Requested upsweep time {time_up}s is invalid (must be > 0).')
-        if not (time_down > 0):
-            raise ValueError(f'Requested downsweep time {time_down}s is invalid (must be > 0).')
-        # Check if repump time is nonzero
-        if time_repump < 0:
-            raise ValueError(f'Requested repump time {time_repump} is invalid (must be non-negative).')
+        # Check the pixel numbers and scan times
+        _validate_scan_parameters(
+            n_pixels_up=n_pixels_up,
+            n_pixels_down=n_pixels_down,
+            n_subpixels=n_subpixels,
+            time_up=time_up,
+            time_down=time_down,
+            time_repump=time_repump
+        )
 
         # Compute the time per sample on the up/down sweep
         self.time_per_subpixel_up = time_up / self.n_subpixels_up
@@ -168,15 +286,18 @@ class PLEControllerPulsedRepumpContinuous(PLEControllerBase):
         # Raise warnings if the clock rate is too slow
         if self.cycles_per_repump < 5:
             logger.warning(
-                f'Clock cycles during repump ({self.cycles_per_repump}) is less than 5, timing error may exceed 10%.'
+                'Clock cycles during repump (%d) is less than 5, timing error may exceed 10%%.',
+                self.cycles_per_repump
             )
         if self.cycles_per_subpixel_up < 5:
             logger.warning(
-                f'Clock cycles per subpixel up ({self.cycles_per_subpixel_up}) is less than 5, timing error may exceed 10%.'
+                'Clock cycles per subpixel up (%d) is less than 5, timing error may exceed 10%%.',
+                self.cycles_per_subpixel_up
             )
         if self.cycles_per_subpixel_down < 5:
             logger.warning(
-                f'Clock cycles per subpixel down ({self.cycles_per_subpixel_down}) is less than 5, timing error may exceed 10%.'
+                'Clock cycles per subpixel down (%d) is less than 5, timing error may exceed 10%%.',
+                self.cycles_per_subpixel_down
             )
         
         # Compute the number of samples
@@ -186,29 +307,41 @@ class PLEControllerPulsedRepumpContinuous(PLEControllerBase):
         self.n_samples_scan = self.n_samples_upscan + self.n_samples_downscan
         self.n_samples_total = self.n_samples_repump + self.n_samples_upscan + self.n_samples_downscan
 
-        # Compute output datastream for the scanning laser
-        subpixel_values_up = np.linspace(start=min, stop=max, num=n_pixels_up*n_subpixels, endpoint=False)
-        subpixel_values_down = np.linspace(start=max, stop=min, num=n_pixels_down*n_subpixels, endpoint=False)
-        # Sample values are what data is actually written to the scan_laser
-        # In this implementation the laser is held at the subpixel value for the associated number 
-        # of clock cycles.
-        scan_samples_up = np.repeat(a=subpixel_values_up, repeats=self.cycles_per_subpixel_up) 
-        scan_samples_down = np.repeat(a=subpixel_values_down, repeats=self.cycles_per_subpixel_down)
+        # Compute output datastream for the scanning laser. The subpixel values only depend on the
+        # scan range and number of subpixels so they are only recomputed if one of these changed.
+        subpixel_values_key = (min, max, n_pixels_up, n_pixels_down, n_subpixels)
+        if subpixel_values_key != self.subpixel_values_key:
+            self.subpixel_values_up = np.linspace(start=min, stop=max, num=n_pixels_up*n_subpixels, endpoint=False)
+            self.subpixel_values_down = np.linspace(start=max, stop=min, num=n_pixels_down*n_subpixels, endpoint=False)
+            self.subpixel_values_key = subpixel_values_key
+        subpixel_values_up = self.subpixel_values_up
+        subpixel_values_down = self.subpixel_values_down
+        # Sample values are what data is actually written to the scan_laser. The output buffers are
+        # only allocated if the number of samples has changed since the last configuration and each
+        # segment (repump, upscan, downscan) is filled in place to avoid allocating the segments
+        # separately and then concatenating them.
+        if (self.scan_laser_output_buffer is None) or (len(self.scan_laser_output_buffer) != self.n_samples_total):
+            self.scan_laser_output_buffer = np.empty(self.n_samples_total, dtype=np.float64)
+            self.repump_laser_output_buffer = np.empty(self.n_samples_total, dtype=np.float64)
+        scan_laser_output = self.scan_laser_output_buffer
         # Sample values during the repump step are held to the minimum value
-        scan_samples_repump = np.ones(self.n_samples_repump) * min
-        # Combine to get the scan laser output
-        scan_laser_output = np.concatenate(
-            arrays=[scan_samples_repump, scan_samples_up, scan_samples_down]
-        )
+        scan_laser_output[:self.n_samples_repump] = min
+        # In this implementation the laser is held at the subpixel value for the associated number
+        # of clock cycles. Each scan segment is viewed as a `(n_subpixels, cycles_per_subpixel)`
+        # array and the subpixel values are broadcast across the cycles, writing directly into the
+        # output buffer without an intermediate `np.repeat` array.
+        start_up = self.n_samples_repump
+        start_down = self.n_samples_repump + self.n_samples_upscan
+        scan_laser_output[start_up:start_down].reshape(
+            self.n_subpixels_up, self.cycles_per_subpixel_up)[:] = subpixel_values_up[:,None]
+        scan_laser_output[start_down:].reshape(
+            self.n_subpixels_down, self.cycles_per_subpixel_down)[:] = subpixel_values_down[:,None]
 
         # Compute output datstream for the repump laser
         # Laser is on during the repump step and off otherwise
-        repump_samples_repump = np.ones(self.n_samples_repump) * self.repump_laser_setpoints['on']
-        repump_samples_scan = np.ones(self.n_samples_scan) * self.repump_laser_setpoints['off']
-        # Combine to get repump laser output
-        repump_laser_output = np.concatenate(
-            arrays=[repump_samples_repump, repump_samples_scan]
-        )
+        repump_laser_output = self.repump_laser_output_buffer
+        repump_laser_output[:self.n_samples_repump] = self.repump_laser_setpoints['on']
+        repump_laser_output[self.n_samples_repump:] = self.repump_laser_setpoints['off']
 
         # Save the output datastreams
         self.output_data = {
@@ -248,80 +381,67 @@ class PLEControllerPulsedRepumpContinuous(PLEControllerBase):
             (1) `'sum'`: report the sum of the samples
             (2) `'average'`: average the samples in 
             (3) `'first'`: report the first sample (default behavior)
+            (4) `'last'`: report the last sample
         '''
 
         # Dictionary to save the data in
         output_dict = {}
 
+        # Get the sequence parameters once outside of the loop
+        n_samples_scan = self.n_samples_scan
+        n_samples_upscan = self.n_samples_upscan
+        n_samples_downscan = self.n_samples_downscan
+        n_pixels_up = self.n_pixels_up
+        n_pixels_down = self.n_pixels_down
+        n_subpixels = self.n_subpixels
+        n_subpixels_up = self.n_subpixels_up
+        n_subpixels_down = self.n_subpixels_down
+        cycles_per_subpixel_up = self.cycles_per_subpixel_up
+        cycles_per_subpixel_down = self.cycles_per_subpixel_down
+
         for name in data:
 
-            # Split the data into upscan and downscan then reshape into 2-d array with shape
-            # `(n_subpixels, cycles_per_subpixel)`.
-            subpixel_data_up = data[name][self.n_samples_repump:self.n_samples_repump+self.n_samples_upscan]
-            subpixel_data_up_reshaped = subpixel_data_up.reshape(
-                self.n_subpixels_up, self.cycles_per_subpixel_up
+            # Split the data into upscan and downscan segments. Input data is only recorded after
+            # the repump (via the readout delay) while the output data spans the entire sequence; in
+            # either case the scan corresponds to the final `n_samples_scan` samples.
+            start_up = len(data[name]) - n_samples_scan
+            start_down = start_up + n_samples_upscan
+            subpixel_data_up = data[name][start_up:start_down]
+            subpixel_data_down = data[name][start_down:start_down+n_samples_downscan]
+
+            # Get the instruction, defaulting to 'first'
+            instruction = instructions.get(name, 'first')
+
+            # Allocate the combined up/downscan arrays, the up/downscan entries are views into them
+            dtype = _reduced_dtype(data[name].dtype, instruction)
+            subpixel_values = np.empty(n_subpixels_up+n_subpixels_down, dtype=dtype)
+            pixel_values = np.empty(n_pixels_up+n_pixels_down, dtype=dtype)
+            output_dict[name+'_subpixel'] = subpixel_values
+            output_dict[name+'_subpixel_up'] = subpixel_values[:n_subpixels_up]
+            output_dict[name+'_subpixel_down'] = subpixel_values[n_subpixels_up:]
+            output_dict[name] = pixel_values
+            output_dict[name+'_up'] = pixel_values[:n_pixels_up]
+            output_dict[name+'_down'] = pixel_values[n_pixels_up:]
+
+            # Reduce the samples directly into the subpixel and pixel values
+            _reduce_samples(
+                samples=subpixel_data_up,
+                n_pixels=n_pixels_up,
+                n_subpixels=n_subpixels,
+                cycles_per_subpixel=cycles_per_subpixel_up,
+                instruction=instruction,
+                subpixel_out=output_dict[name+'_subpixel_up'],
+                pixel_out=output_dict[name+'_up']
             )
-            subpixel_data_down = data[name][self.n_samples_repump:self.n_samples_repump+self.n_samples_upscan]
-            subpixel_data_down_reshaped = subpixel_data_down.reshape(
-                self.n_subpixels_up, self.cycles_per_subpixel_up
+            _reduce_samples(
+                samples=subpixel_data_down,
+                n_pixels=n_pixels_down,
+                n_subpixels=n_subpixels,
+                cycles_per_subpixel=cycles_per_subpixel_down,
+                instruction=instruction,
+                subpixel_out=output_dict[name+'_subpixel_down'],
+                pixel_out=output_dict[name+'_down']
             )
-
-            if (name not in instructions) or (instructions[name] == 'first'):
-                # Get the first data point of each subpixel
-                output_dict[name+'_subpixel_up'] = subpixel_data_up_reshaped[:,0].squeeze()
-                output_dict[name+'_subpixel_down'] = subpixel_data_down_reshaped[:,0].squeeze()
-                output_dict[name+'_subpixel'] = np.concatenate(
-                    arrays=[ output_dict[name+'_subpixel_up'], output_dict[name+'_subpixel_down'] ]
-                )
-                # Compute the values at the pixels
-                output_dict[name+'_up'] = output_dict[name+'_subpixel_up'].reshape(
-                        self.n_pixels_up, self.n_subpixels)[:,0].squeeze()
-                output_dict[name+'_down'] = output_dict[name+'_subpixel_down'].reshape(
-                        self.n_pixels_up, self.n_subpixels)[:,0].squeeze()
-                output_dict[name] = np.concatenate(
-                    arrays=[ output_dict[name+'_up'], output_dict[name+'_down'] ]
-                )
-            # Else if 'sum' take the sum
-            elif instructions[name] == 'sum':
-                output_dict[name+'_subpixel_up'] = np.sum(subpixel_data_up_reshaped, axis=1).squeeze()
-                output_dict[name+'_subpixel_down'] = np.sum(subpixel_data_down_reshaped, axis=1).squeeze()
-                output_dict[name+'_subpixel'] = np.concatenate(
-                    arrays=[ output_dict[name+'_subpixel_up'], output_dict[name+'_subpixel_down'] ]
-                )
-                # Compute the values at the pixels
-                output_dict[name+'_up'] = np.sum(
-                    output_dict[name+'_subpixel_up'].reshape(self.n_pixels_up, self.n_subpixels),
-                    axis=1
-                ).squeeze()
-                output_dict[name+'_down'] = np.sum(
-                    output_dict[name+'_subpixel_down'].reshape(self.n_pixels_down, self.n_subpixels),
-                    axis=1
-                ).squeeze()
-                output_dict[name] = np.concatenate(
-                    arrays=[ output_dict[name+'_up'], output_dict[name+'_down'] ]
-                )
-            # Else if 'average' take the average
-            elif instructions[name] == 'average':
-                output_dict[name+'_subpixel_up'] = np.average(subpixel_data_up_reshaped, axis=1).squeeze()
-                output_dict[name+'_subpixel_down'] = np.average(subpixel_data_down_reshaped, axis=1).squeeze()
-                output_dict[name+'_subpixel'] = np.concatenate(
-                    arrays=[ output_dict[name+'_subpixel_up'], output_dict[name+'_subpixel_down'] ]
-                )
-                # Compute the values at the pixels
-                output_dict[name+'_up'] = np.average(
-                    output_dict[name+'_subpixel_up'].reshape(self.n_pixels_up, self.n_subpixels),
-                    axis=1
-                ).squeeze()
-                output_dict[name+'_down'] = np.average(
-                    output_dict[name+'_subpixel_down'].reshape(self.n_pixels_down, self.n_subpixels),
-                    axis=1
-                ).squeeze()
-                output_dict[name] = np.concatenate(
-                    arrays=[ output_dict[name+'_up'], output_dict[name+'_down'] ]
-                )
-            # Raise error if instruction is invalid
-            else:
-                raise ValueError(f'Instruction {instructions[name]} invalid.')
             
         # Return the output dictionary
         return output_dict
@@ -416,13 +536,17 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         self.timeout_downscan = None
 
         # Control attributes
-        self.busy = False       # True if currently executing an action
-        self.stop = False       # Set to `True` externally if controller should stop
+        self._busy_lock = Lock()    # Held while executing an action, see `busy`
+        self.stop = False           # Set to `True` externally if controller should stop
 
         self.scan_laser_id = scan_laser_id
         self.scan_laser_switch_id = scan_laser_switch_id
         self.repump_laser_id = repump_laser_id
         self.counter_id = counter_id
+        _validate_process_instructions(
+            process_instructions=process_instructions,
+            valid_instructions=tuple(_REDUCERS)
+        )
         self.process_instructions = process_instructions
 
     def configure_sequence(
@@ -472,21 +596,15 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
             self.upscan_sequencer.validate_output_data(output_name=self.scan_laser_id,data=max)
         else:
             raise ValueError(f'Requested max {max:.3f} is less than min {min:.3f}.')
-        # Check if pixel numbers are positive integers
-        if type(n_pixels_up) is not int or n_pixels_up < 1:
-            raise ValueError(f'Requested # pixels up {n_pixels_up} is invalid (must be at least 1).')
-        if type(n_pixels_down) is not int or n_pixels_down < 1:
-            raise ValueError(f'Requested # pixels down {n_pixels_down} is invalid (must be at least 1).')
-        if type(n_subpixels) is not int or n_subpixels < 1:
-            raise ValueError(f'Requested # subpixels {n_subpixels} is invalid (must be at least 1).')
-        # Check that up/downscan times are greater than zero.
-        if not (time_up > 0):
-            raise ValueError(f'Requested upsweep time {time_up}s is invalid (must be > 0).')
-        if not (time_down > 0):
-            raise ValueError(f'Requested downsweep time {time_down}s is invalid (must be > 0).')
-        # Check if repump time is nonzero
-        if time_repump < 0:
-            raise ValueError(f'Requested repump time {time_repump} is invalid (must be non-negative).')
+        # Check the pixel numbers and scan times
+        _validate_scan_parameters(
+            n_pixels_up=n_pixels_up,
+            n_pixels_down=n_pixels_down,
+            n_subpixels=n_subpixels,
+            time_up=time_up,
+            time_down=time_down,
+            time_repump=time_repump
+        )
 
         # Compute the number of samples
         self.n_samples_repump = int(time_repump * 100000)
@@ -505,10 +623,10 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         scan_samples_downscan = np.linspace(start=max, stop=min, num=self.n_samples_downscan, endpoint=False)
         # Compute the output datastream for scanning laser and repump laser switches
         # Scan laser is on continuously while the repump laser is off
-        scan_laser_switch_samples_upscan = np.ones(self.n_samples_upscan)
-        repump_samples_upscan = np.zeros(self.n_samples_upscan)
-        scan_laser_switch_samples_downscan = np.ones(self.n_samples_downscan)
-        repump_samples_downscan = np.zeros(self.n_samples_downscan)
+        scan_laser_switch_samples_upscan = np.ones(self.n_samples_upscan, dtype=np.uint32)
+        repump_samples_upscan = np.zeros(self.n_samples_upscan, dtype=np.uint32)
+        scan_laser_switch_samples_downscan = np.ones(self.n_samples_downscan, dtype=np.uint32)
+        repump_samples_downscan = np.zeros(self.n_samples_downscan, dtype=np.uint32)
 
         # Compute output datstream for the repump sequence
         # Repump laser is on continuously, add two additional points and turn off repump.
@@ -520,7 +638,7 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         # Scan laser is also on continuously (can turn off but no point in doing so)
         scan_laser_switch_samples_repump = np.ones(self.n_samples_repump+2, dtype=np.uint32)
         # Scan laser voltage is set to the start value
-        scan_laser_samples_repump = np.ones(self.n_samples_repump+2) * min
+        scan_laser_samples_repump = np.full(self.n_samples_repump+2, min, dtype=np.float64)
 
         # Save the output datastreams
         self.output_data_repump = {
@@ -565,7 +683,7 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
     def _run_sequence(
             self, 
             process_method: Callable = None,
-            process_kwargs: dict = {}
+            process_kwargs: dict = None
     ) -> Union[dict[str,np.ndarray], Any]:
         
         # Run the repump sequence
@@ -579,10 +697,10 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
             timeout=self.timeout_repump
         )
         logger.info('Finished repump.')
-        # Get the data as a dictionary with names appended with repump/upscan/downscan
-        repump_data = {
-            'repump_'+id: val for id,val in self.repump_sequencer.get_data().items()
-        }
+        # Get the data, storing it in a single dictionary with names prefixed by the segment
+        data = {}
+        for id, val in self.repump_sequencer.get_data().items():
+            data['repump_'+id] = val
 
         # Run the repump sequence
         logger.info('Starting upscan...')
@@ -596,9 +714,8 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         )
         logger.info('Finished upscan.')
         # Get the data
-        upscan_data = {
-            'upscan_subpixel_'+id: val for id,val in self.upscan_sequencer.get_data().items()
-        }
+        for id, val in self.upscan_sequencer.get_data().items():
+            data['upscan_subpixel_'+id] = val
 
         # Run the repump sequence
         logger.info('Starting downscan...')
@@ -612,23 +729,20 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         )
         logger.info('Finished downscan.')
         # Get the data
-        downscan_data = {
-            'downscan_subpixel_'+id: val for id,val in self.downscan_sequencer.get_data().items()
-        }
-        # Combine
-        data = {**repump_data, **upscan_data, **downscan_data}
-
+        for id, val in self.downscan_sequencer.get_data().items():
+            data['downscan_subpixel_'+id] = val
         # Return the data dictionary if no process method is provided
         if process_method is None:
             return data
         else:
             # Otherwise return the processed data
-            return process_method(data, **process_kwargs)
+            return process_method(data, **(process_kwargs or {}))
         
     def process_data(
             self,
             data: dict[str,np.ndarray],
-            instructions: dict[str,str]
+            instructions: dict[str,str],
+            include_raw: bool = True
     ) -> dict[str, np.ndarray]:
         '''
         Process the data to return values in terms of the subpixels and pixels rather than clock
@@ -638,6 +752,12 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
             (1) `'sum'`: report the sum of the samples
             (2) `'average'`: average the samples in 
             (3) `'first'`: report the first sample (default behavior)
+            (4) `'last'`: report the last sample
+
+        The processed entries for each source are newly allocated, with the `'upscan_'` and
+        `'downscan_'` entries being views into the combined entry. If `include_raw` is `True` the
+        raw data arrays are added to the output as-is without copying. Set `include_raw=False` if
+        the raw data is not needed to omit them from the output entirely.
         '''
 
         # Dictionary to save the data in
@@ -646,38 +766,35 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         # Get the names of the inputs and outputs
         source_names = [key for key in self.upscan_sequencer.input_channels_group] + [key for key in self.upscan_sequencer.output_channels_group]
 
+        # Shapes of the up/downscan data, computed once outside of the loop
+        n_pixels_up = self.n_pixels_up
+        n_pixels_down = self.n_pixels_down
+        upscan_shape = (n_pixels_up, self.n_subpixels)
+        downscan_shape = (n_pixels_down, self.n_subpixels)
+
         # Iterate through the names of the sources to process the subpixels
         for name in source_names:
 
             # Reshape the data
-            upscan_data_reshaped = data['upscan_subpixel_'+name].reshape(self.n_pixels_up, self.n_subpixels)
-            downscan_data_reshaped = data['downscan_subpixel_'+name].reshape(self.n_pixels_down, self.n_subpixels)
-
-            # Extract data as instructed
-            if (name not in instructions) or (instructions[name] == 'first'):
-                # Get the first data point of each subpixel
-                output_dict['upscan_'+name] = upscan_data_reshaped[:,0].squeeze()
-                output_dict['downscan_'+name] = downscan_data_reshaped[:,0].squeeze()
-            elif instructions[name] == 'last':
-                # Get the last data point of each subpixel
-                output_dict['upscan_'+name] = upscan_data_reshaped[:,-1].squeeze()
-                output_dict['downscan_'+name] = downscan_data_reshaped[:,-1].squeeze()
-            elif instructions[name] == 'sum':
-                # Get the sum of the data points at each subpixel
-                output_dict['upscan_'+name] = np.sum(upscan_data_reshaped, axis=1).squeeze()
-                output_dict['downscan_'+name] = np.sum(downscan_data_reshaped, axis=1).squeeze()
-            elif instructions[name] == 'average':
-                # Get the average of the data points at each subpixel
-                output_dict['upscan_'+name] = np.average(upscan_data_reshaped, axis=1).squeeze()
-                output_dict['downscan_'+name] = np.average(downscan_data_reshaped, axis=1).squeeze()
-            else:
-                ValueError(f'Instruction {instructions[name]} invalid.')
-
-            # Combined data
-            output_dict[name] = np.concatenate([ output_dict['upscan_'+name], output_dict['downscan_'+name] ])
-
-        # Add the raw unprocessed data
-        output_dict |= data
+            upscan_data_reshaped = data['upscan_subpixel_'+name].reshape(upscan_shape)
+            downscan_data_reshaped = data['downscan_subpixel_'+name].reshape(downscan_shape)
+
+            # Extract data as instructed, defaulting to 'first'
+            instruction = instructions.get(name, 'first')
+            reducer = _get_reducer(instruction)
+            # Reduce directly into the combined array, the up/downscan entries are views into it
+            output_dict[name] = np.empty(
+                n_pixels_up+n_pixels_down, 
+                dtype=_reduced_dtype(upscan_data_reshaped.dtype, instruction)
+            )
+            output_dict['upscan_'+name] = output_dict[name][:n_pixels_up]
+            output_dict['downscan_'+name] = output_dict[name][n_pixels_up:]
+            reducer(upscan_data_reshaped, output_dict['upscan_'+name])
+            reducer(downscan_data_reshaped, output_dict['downscan_'+name])
+
+        # Add the raw unprocessed data if requested
+        if include_raw:
+            output_dict |= data
 
         # Return the data
         return output_dict
@@ -690,11 +807,9 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
         '''
         Sets the output of the controller specified by `output_id` to the `setpoint`.
         '''
-        # Block action if busy
-        if self.busy:
+        # Reserve the controller, blocking action if busy
+        if not self._busy_lock.acquire(blocking=False):
             raise RuntimeError('Controller is currently in use.')
-        # Reserve the controller
-        self.busy=True
         # Attempt to set the value of the specified output to the set point using the repump sequencer
         try:
             self.repump_sequencer.set_output(output_name = output_id, setpoint=setpoint)
@@ -709,7 +824,7 @@ class PLEControllerPulsedRepumpSegmented(SequenceControllerBase):
             raise e
         finally:
             # Release the controller
-            self.busy=False
+            self._busy_lock.release()
 
 
 class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpSegmented):
@@ -798,7 +913,7 @@ class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpS
     def _run_sequence(
             self, 
             process_method: Callable = None,
-            process_kwargs: dict = {}
+            process_kwargs: dict = None
     ) -> Union[dict[str,np.ndarray], Any]:
         '''
         Runs the sequence of repump, upscan, and downscan in sequence.
@@ -823,10 +938,10 @@ class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpS
             timeout=self.timeout_repump
         )
         logger.info('Finished repump.')
-        # Get the data as a dictionary with names appended with repump/upscan/downscan
-        repump_data = {
-            'repump_'+id: val for id,val in self.repump_sequencer.get_data().items()
-        }
+        # Get the data, storing it in a single dictionary with names prefixed by the segment
+        data = {}
+        for id, val in self.repump_sequencer.get_data().items():
+            data['repump_'+id] = val
 
         # Create the thread to watch the wavemeter thread and start it.
         # The thread will immediately start to collect the data from the wavemeter.
@@ -851,16 +966,15 @@ class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpS
         # Log the upscan completion
         logger.info('Finished upscan.')
         # Get the data
-        upscan_data = {
-            'upscan_subpixel_'+id: val for id,val in self.upscan_sequencer.get_data().items()
-        }
+        for id, val in self.upscan_sequencer.get_data().items():
+            data['upscan_subpixel_'+id] = val
         # Add the wavemeter tags and values to the upscan data dictionary
-        upscan_data['upscan_wavemeter_tags'] = np.pad(
+        data['upscan_wavemeter_tags'] = np.pad(
             np.array(self.last_thread_wavemeter_tags, dtype=np.float32),
             pad_width=(0,self.upscan_query_buffer_size - len(self.last_thread_wavemeter_tags)),
             mode='constant',
             constant_values=np.nan)
-        upscan_data['upscan_wavemeter_vals'] = np.pad(
+        data['upscan_wavemeter_vals'] = np.pad(
             self.last_thread_wavemeter_vals,
             pad_width=(0,self.upscan_query_buffer_size - len(self.last_thread_wavemeter_vals)),
             mode='constant',
@@ -887,24 +1001,20 @@ class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpS
         # Log the downscan completion
         logger.info('Finished downscan.')
         # Get the data
-        downscan_data = {
-            'downscan_subpixel_'+id: val for id,val in self.downscan_sequencer.get_data().items()
-        }
+        for id, val in self.downscan_sequencer.get_data().items():
+            data['downscan_subpixel_'+id] = val
         # Add the wavemeter tags and values to the downscan data dictionary
-        downscan_data['downscan_wavemeter_tags'] = np.pad(
+        data['downscan_wavemeter_tags'] = np.pad(
             np.array(self.last_thread_wavemeter_tags, dtype=np.float32),
             pad_width=(0,self.downscan_query_buffer_size - len(self.last_thread_wavemeter_tags)),
             mode='constant',
             constant_values=np.nan)
-        downscan_data['downscan_wavemeter_vals'] = np.pad(
+        data['downscan_wavemeter_vals'] = np.pad(
             self.last_thread_wavemeter_vals,
             pad_width=(0,self.downscan_query_buffer_size - len(self.last_thread_wavemeter_vals)),
             mode='constant',
             constant_values=np.nan)
 
-        # Combine
-        data = {**repump_data, **upscan_data, **downscan_data}
-
         # Close the wavemeter connection, freeing it up for other applications
         self.wavemeter.close()
 
@@ -913,7 +1023,7 @@ class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpS
             return data
         else:
             # Otherwise return the processed data
-            return process_method(data, **process_kwargs)
+            return process_method(data, **(process_kwargs or {}))
         
 
     def _wavemeter_query_thread_function(
@@ -941,7 +1051,7 @@ class PLEControllerPulsedRepumpSegmentedWithWavemeter(PLEControllerPulsedRepumpS
                     logger.debug('Wavemeter readout error: reading value invalid')
             # Catch excpetions (i.e. if the wavemeter hasn't gotten a new value to output yet)
             except Exception as e:
-                logger.debug('Wavemeter readout error:', e)
+                logger.debug('Wavemeter readout error: %s', e)
             # Wait for the delay (accounts for finite delay between subsequent wavemeter readout)
             time.sleep(self.nondaq_query_delay)
 
@@ -1040,21 +1150,15 @@ class PLEControllerPulsedRepumpCWPumpSegmentedWithWavemeter(PLEControllerPulsedR
             self.upscan_sequencer.validate_output_data(output_name=self.scan_laser_id,data=max)
         else:
             raise ValueError(f'Requested max {max:.3f} is less than min {min:.3f}.')
-        # Check if pixel numbers are positive integers
-        if type(n_pixels_up) is not int or n_pixels_up < 1:
-            raise ValueError(f'Requested # pixels up {n_pixels_up} is invalid (must be at least 1).')
-        if type(n_pixels_down) is not int or n_pixels_down < 1:
-            raise ValueError(f'Requested # pixels down {n_pixels_down} is invalid (must be at least 1).')
-        if type(n_subpixels) is not int or n_subpixels < 1:
-            raise ValueError(f'Requested # subpixels {n_subpixels} is invalid (must be at least 1).')
-        # Check that up/downscan times are greater than zero.
-        if not (time_up > 0):
-            raise ValueError(f'Requested upsweep time {time_up}s is invalid (must be > 0).')
-        if not (time_down > 0):
-            raise ValueError(f'Requested downsweep time {time_down}s is invalid (must be > 0).')
-        # Check if repump time is nonzero
-        if time_repump < 0:
-            raise ValueError(f'Requested repump time {time_repump} is invalid (must be non-negative).')
+        # Check the pixel numbers and scan times
+        _validate_scan_parameters(
+            n_pixels_up=n_pixels_up,
+            n_pixels_down=n_pixels_down,
+            n_subpixels=n_subpixels,
+            time_up=time_up,
+            time_down=time_down,
+            time_repump=time_repump
+        )
 
         # Compute the number of samples
         self.n_samples_repump = int(time_repump * 100000)
@@ -1073,20 +1177,20 @@ class PLEControllerPulsedRepumpCWPumpSegmentedWithWavemeter(PLEControllerPulsedR
         scan_samples_downscan = np.linspace(start=max, stop=min, num=self.n_samples_downscan, endpoint=False)
         # Compute the output datastream for scanning laser and repump laser switches
         # Scan laser is on continuously while the repump laser is off
-        scan_laser_switch_samples_upscan = np.ones(self.n_samples_upscan)
-        repump_samples_upscan = np.zeros(self.n_samples_upscan)
-        scan_laser_switch_samples_downscan = np.ones(self.n_samples_downscan)
-        repump_samples_downscan = np.zeros(self.n_samples_downscan)
+        scan_laser_switch_samples_upscan = np.ones(self.n_samples_upscan, dtype=np.uint32)
+        repump_samples_upscan = np.zeros(self.n_samples_upscan, dtype=np.uint32)
+        scan_laser_switch_samples_downscan = np.ones(self.n_samples_downscan, dtype=np.uint32)
+        repump_samples_downscan = np.zeros(self.n_samples_downscan, dtype=np.uint32)
         # Turn the pump on if indicated on the GUI
         if pump_on:
             logger.info('Pump ON during scan.')
-            pump_samples_upscan = np.ones(self.n_samples_upscan)
-            pump_samples_downscan = np.ones(self.n_samples_downscan)
+            pump_samples_upscan = np.ones(self.n_samples_upscan, dtype=np.uint32)
+            pump_samples_downscan = np.ones(self.n_samples_downscan, dtype=np.uint32)
             pump_laser_switch_samples_repump = np.ones(self.n_samples_repump+2, dtype=np.uint32)
         else:
             logger.info('Pump OFF during scan.')
-            pump_samples_upscan = np.zeros(self.n_samples_upscan)
-            pump_samples_downscan = np.zeros(self.n_samples_downscan)
+            pump_samples_upscan = np.zeros(self.n_samples_upscan, dtype=np.uint32)
+            pump_samples_downscan = np.zeros(self.n_samples_downscan, dtype=np.uint32)
             pump_laser_switch_samples_repump = np.zeros(self.n_samples_repump+2, dtype=np.uint32)
 
         # Compute output datstream for the repump sequence
@@ -1099,7 +1203,7 @@ class PLEControllerPulsedRepumpCWPumpSegmentedWithWavemeter(PLEControllerPulsedR
         # Scan laser is also on continuously (can turn off but no point in doing so)
         scan_laser_switch_samples_repump = np.ones(self.n_samples_repump+2, dtype=np.uint32)
         # Scan laser voltage is set to the start value
-        scan_laser_samples_repump = np.ones(self.n_samples_repump+2) * min
+        scan_laser_samples_repump = np.full(self.n_samples_repump+2, min, dtype=np.float64)
 
         # Save the output datastreams
         self.output_data_repump = {
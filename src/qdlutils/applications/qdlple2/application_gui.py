@@ -1,16 +1,96 @@
 import logging
+from dataclasses import dataclass
 
 import numpy as np
-import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.ticker import FixedFormatter, FixedLocator, MultipleLocator
 import matplotlib.pyplot as plt
 
 import tkinter as tk
 
-matplotlib.use('Agg')
-
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
+
+# Period in ms at which the scan figure checks for requested redraws (about 30 fps)
+REDRAW_PERIOD_MS = 33
+
+# Scan settings shown in the control panels as (label, scan parameter, default value)
+SCAN_SETTINGS = (
+    ('Min voltage (V)', 'min', -3),
+    ('Max voltage (V)', 'max', 5),
+    ('# of pixels up', 'n_pixels_up', 200),
+    ('# of pixels down', 'n_pixels_down', 10),
+    ('# of scans', 'n_scans', 10),
+    ('Upsweep time (s)', 'time_up', 10),          # Time for the upsweep min -> max
+    ('Downsweep time (s)', 'time_down', 1),       # Time for the downsweep max -> min
+)
+# Number of subpixels to sample (each pixel has this number of samples). Note that excessively 
+# large values will slow the scan speed down due to the voltage movement overhead.
+ADVANCED_SCAN_SETTINGS = (
+    ('# of sub-pixels', 'n_subpixels', 16),
+    ('Reump time (s)', 'time_repump', 0),
+)
+
+def _add_settings_entries(
+        frame: tk.Frame,
+        settings: tuple,
+        row: int,
+        values: dict = None,
+        readonly: bool = False
+) -> tuple[dict, int]:
+    '''
+    Adds a labeled entry to `frame` for each `(label, key, default)` in `settings`, starting on the
+    row after `row`. Entries are initialized to `values[key]` if `values` is provided and to the
+    default otherwise. Returns a dictionary of the entries by key and the last row used.
+    '''
+    entries = {}
+    for label, key, default in settings:
+        row += 1
+        tk.Label(frame, text=label).grid(row=row, column=0)
+        entry = tk.Entry(frame, width=10)
+        entry.insert(0, default if values is None else values[key])
+        if readonly:
+            entry.config(state='readonly')
+        entry.grid(row=row, column=1, padx=10)
+        entries[key] = entry
+    return entries, row
+
+@dataclass(frozen=True)
+class ScanGeometry:
+    '''
+    Plot geometry of a PLE scan. These only depend on the scan parameters and so are computed once
+    at the start of the scan and shared by all redraws.
+
+    Matplotlib's imshow maps all pixels to the same size. However we want to show both the up and 
+    down sweep at the same time which have different scales in voltage. To work around this, we 
+    pick the axis scale from 0 -> 1 on the upscan and 1 -> `y_max` on the down scan.
+    '''
+    y_max: float
+    unitless_voltages: np.ndarray
+    voltage_ticks: list
+    voltage_tick_labels: list
+
+    @classmethod
+    def from_scan_parameters(cls, scan_parameters: dict) -> 'ScanGeometry':
+        # Proportionality requires
+        y_max = 1 + scan_parameters['n_pixels_down']/scan_parameters['n_pixels_up']
+        return cls(
+            y_max = y_max,
+            # Position of each pixel on the unitless voltage axis
+            unitless_voltages = np.linspace(
+                start=0, 
+                stop=y_max, 
+                num=scan_parameters['n_pixels_down']+scan_parameters['n_pixels_up']),
+            # Voltage ticks placed on the upsweep only
+            voltage_ticks = [0,0.25,0.5,0.75,1.0],
+            voltage_tick_labels = [
+                str(v) for v in np.round(
+                    np.linspace(scan_parameters['min'], scan_parameters['max'], num=5),
+                    decimals=3)
+            ]
+        )
+
 
 class LauncherApplicationView:
 
@@ -43,67 +123,14 @@ class LauncherControlPanel:
         # Define settings frame to set all scan settings
         settings_frame = tk.Frame(main_frame)
         settings_frame.pack(side=tk.TOP, padx=0, pady=[10,0])
-        # Min voltage
-        row += 1
-        tk.Label(settings_frame, text="Min voltage (V)").grid(row=row, column=0)
-        self.voltage_start_entry = tk.Entry(settings_frame, width=10)
-        self.voltage_start_entry.insert(0, -3)
-        self.voltage_start_entry.grid(row=row, column=1)
-        # Max voltage
-        row += 1
-        tk.Label(settings_frame, text="Max voltage (V)").grid(row=row, column=0)
-        self.voltage_end_entry = tk.Entry(settings_frame, width=10)
-        self.voltage_end_entry.insert(0, 5)
-        self.voltage_end_entry.grid(row=row, column=1)
-        # Number of pixels on upsweep
-        row += 1
-        tk.Label(settings_frame, text="# of pixels up").grid(row=row, column=0)
-        self.num_pixels_up_entry = tk.Entry(settings_frame, width=10)
-        self.num_pixels_up_entry.insert(0, 200)
-        self.num_pixels_up_entry.grid(row=row, column=1)
-        # Number of pixels on downsweep
-        row += 1
-        tk.Label(settings_frame, text="# of pixels down").grid(row=row, column=0)
-        self.num_pixels_down_entry = tk.Entry(settings_frame, width=10)
-        self.num_pixels_down_entry.insert(0, 10)
-        self.num_pixels_down_entry.grid(row=row, column=1)
-        # Number of scans
-        row += 1
-        tk.Label(settings_frame, text="# of scans").grid(row=row, column=0)
-        self.scan_num_entry = tk.Entry(settings_frame, width=10)
-        self.scan_num_entry.insert(0, 10)
-        self.scan_num_entry.grid(row=row, column=1, padx=10)
-        # Time for the upsweep min -> max
-        row += 1
-        tk.Label(settings_frame, text="Upsweep time (s)").grid(row=row, column=0)
-        self.upsweep_time_entry = tk.Entry(settings_frame, width=10)
-        self.upsweep_time_entry.insert(0, 10)
-        self.upsweep_time_entry.grid(row=row, column=1)
-        # Time for the downsweep max -> min
-        row += 1
-        tk.Label(settings_frame, text="Downsweep time (s)").grid(row=row, column=0)
-        self.downsweep_time_entry = tk.Entry(settings_frame, width=10)
-        self.downsweep_time_entry.insert(0, 1)
-        self.downsweep_time_entry.grid(row=row, column=1, padx=10)
+        self.settings_entries, row = _add_settings_entries(settings_frame, SCAN_SETTINGS, row)
         # Adding advanced settings
         row += 1
         tk.Label(settings_frame, 
                  text="Advanced settings:", 
                  font='Helvetica 10').grid(row=row, column=0, pady=[10,5], columnspan=3)
-        # Number of subpixels to sample (each pixel has this number of samples)
-        # Note that excessively large values will slow the scan speed down due to
-        # the voltage movement overhead.
-        row += 1
-        tk.Label(settings_frame, text="# of sub-pixels").grid(row=row, column=0)
-        self.subpixel_entry = tk.Entry(settings_frame, width=10)
-        self.subpixel_entry.insert(0, 16)
-        self.subpixel_entry.grid(row=row, column=1)
-        # Button to enable repump at start of scan?
-        row += 1
-        tk.Label(settings_frame, text="Reump time (s)").grid(row=row, column=0)
-        self.repump_entry = tk.Entry(settings_frame, width=10)
-        self.repump_entry.insert(0, 0)
-        self.repump_entry.grid(row=row, column=1)
+        advanced_entries, row = _add_settings_entries(settings_frame, ADVANCED_SCAN_SETTINGS, row)
+        self.settings_entries |= advanced_entries
 
 
         # Define control frame to modify DAQ settings
@@ -154,10 +181,23 @@ class ScanApplicationView:
         
         self.application = application
         self.settings_dict = settings_dict
+        self.window = window
 
         # Figure properties
         self.norm_min = None
         self.norm_max = None
+        # Image artist if currently drawn and the data source it displays, updated in place
+        self.img = None
+        self.img_data_to_plot_y = None
+        # Autoscaled color limits of the image and the number of scans they include
+        self.auto_vmin = None
+        self.auto_vmax = None
+        self.auto_n_scans = 0
+        # Line artists if currently drawn and the data source they display
+        self.lines = []
+        self.lines_data_to_plot_y = None
+        # Collection of the wavemeter lines if currently drawn
+        self.wavemeter_lines = None
         # If data viewport should plot the lines (True) or an image (False)
         self.plot_lines = False
         # Names of all input sources to plot
@@ -165,8 +205,16 @@ class ScanApplicationView:
         # Name of data channels to plot, defaults to the counter vs scan laser
         self.data_to_plot_x = application.application_controller.scan_laser_id
         self.data_to_plot_y = application.application_controller.counter_id
-        # Plot format
+        # Plot format and the format currently drawn on the figure
         self.plot_format = 'Image'
+        self.drawn_format = None
+        # State of the figure when last drawn, see `update_figure()`
+        self.drawn_state = None
+
+        # Plot geometry of the scan, computed once for all redraws
+        self.geometry = ScanGeometry.from_scan_parameters(application.scan_parameters)
+        # Line colors for a given number of lines
+        self.line_colors = {}
 
         # Create the GUI elements
         self.data_viewport = ImageDataViewport(window=window)
@@ -189,159 +237,270 @@ class ScanApplicationView:
         # Initalize the figure
         self.update_figure()
 
+        # Redraws requested by the scan thread are coalesced and performed on the tkinter main loop
+        self.redraw_requested = False
+        self.redraw_job = self.window.after(REDRAW_PERIOD_MS, self._poll_redraw)
+        self.window.bind('<Destroy>', self._cancel_redraw, add='+')
+
+    def request_update(self) -> None:
+        '''
+        Requests that the figure is updated on the next redraw period. Multiple requests before
+        then result in a single update.
+        '''
+        self.redraw_requested = True
+
+    def _poll_redraw(self) -> None:
+        '''
+        Updates the figure if requested and reschedules itself
+        '''
+        if self.redraw_requested:
+            self.redraw_requested = False
+            self.update_figure()
+        self.redraw_job = self.window.after(REDRAW_PERIOD_MS, self._poll_redraw)
+
+    def _cancel_redraw(self, tkinter_event: tk.Event) -> None:
+        '''
+        Stops polling for redraws when the window is destroyed
+        '''
+        # Destroy events of the child widgets are also received here
+        if tkinter_event.widget is self.window:
+            self.window.after_cancel(self.redraw_job)
+
     def update_figure(self) -> None:
-        # Clear the axis
-        self.data_viewport.fig.clear()
-        # Create a new axis
-        self.data_viewport.ax = self.data_viewport.fig.add_subplot(111)
+        # The figure only depends on these values which are plain Python attributes set by the
+        # callbacks, so nothing needs to be read from the tkinter widgets. If none changed since the
+        # last draw, e.g. a repeated normalization, there is nothing to update.
+        state = (
+            self.plot_format,
+            self.data_to_plot_y,
+            self.norm_min,
+            self.norm_max,
+            self.application.n_completed_scans
+        )
+        if state == self.drawn_state:
+            return None
+        self.drawn_state = state
+
+        # Rebuild the axis only if the plot format changed, otherwise the artists already drawn are
+        # updated in place
+        if self.plot_format != self.drawn_format:
+            # Clear the axis
+            self.data_viewport.fig.clear()
+            self.img = None
+            self.img_data_to_plot_y = None
+            self.lines = []
+            self.lines_data_to_plot_y = None
+            self.wavemeter_lines = None
+            # Create a new axis
+            self.data_viewport.ax = self.data_viewport.fig.add_subplot(111)
+            # Set up the axis for the current format
+            if self.plot_format in ('Scans', 'Average'):
+                self._init_lines()
+            # !!!
+            # Need to add more options here if you're adding more non-daq devices!
+            # !!!
+            elif self.plot_format == 'wavemeter':
+                self._init_wavemeter()
+            else:
+                self._init_image()
+            self.drawn_format = self.plot_format
 
         # Plot either the image or the lines depending on the current configuration
-        if self.plot_format == 'Image':
-            self._draw_image()
-        elif self.plot_format == 'Scans':
-            self._draw_lines(average_lines=False)
+        if self.plot_format == 'Scans':
+            self._update_lines(average_lines=False)
         elif self.plot_format == 'Average':
-            self._draw_lines(average_lines=True)
-        # !!!
-        # Need to add more options here if you're adding more non-daq devices!
-        # !!!
+            self._update_lines(average_lines=True)
         elif self.plot_format == 'wavemeter':
-            self._draw_wavemeter()
+            self._update_wavemeter()
         else:
-            self._draw_image()
+            self._update_image()
 
-        self.data_viewport.canvas.draw()
+        self.data_viewport.canvas.draw_idle()
 
-    def _draw_image(self):
+    def _init_image(self):
         '''
-        Draws the data as an image
+        Creates the image along with its colorbar, ticks, and labels on the current axis. The
+        image is then updated in place by `_update_image()` for the following redraws.
         '''
-        # Matplotlib's imshow maps all pixels to the same size. However we want to show both the up
-        # and down sweep at the same time which have different scales in voltage. To work around 
-        # this, we pick the axis scale from 0 -> 1 on the upscan and 1 -> y_max on the down scan.
-        # Proportionality requires
-        y_max = 1 + self.application.scan_parameters['n_pixels_down']/self.application.scan_parameters['n_pixels_up'] 
-
-        # Compute the extent of the image
-        if self.data_to_plot_y in self.application.data:
-            data_to_plot = np.array(self.application.data[self.data_to_plot_y])
-        else:
-            data_to_plot = np.array([[]]) # If there is no data to plot, make empty array
-        n_completed_scans = len(data_to_plot)
-        extent = [0.5, 
-                  n_completed_scans+0.5,
-                  0,
-                  y_max]
-        # Plot the data
-        img = self.data_viewport.ax.imshow(
-            data_to_plot.T,
-            extent = extent,
+        # Plot a placeholder image, the data and extent are set in `_update_image()`
+        self.img = self.data_viewport.ax.imshow(
+            np.zeros(shape=(1,1)),
             cmap = 'Blues', # Default colormap
             origin = 'lower',
             aspect = 'auto',
             interpolation = 'none'
         )
-        # Set the x ticks
-        if n_completed_scans < 11:
-            # Set ticks on all integer values
-            self.data_viewport.ax.set_xticks( np.arange(1,n_completed_scans+1,1) )
-        else:
-            # Set on every 5 if more than 10 scans long
-            self.data_viewport.ax.set_xticks( np.arange(5,n_completed_scans+1,5) )
         # Set the y ticks
         # Place ticks on the upsweep only
-        self.data_viewport.ax.set_yticks(
-            [0,0.25,0.5,0.75,1.0],
-            np.round(
-                np.linspace(self.application.scan_parameters['min'], 
-                            self.application.scan_parameters['max'],
-                            num = 5),
-                decimals=3)
-        )
+        self.data_viewport.ax.yaxis.set_major_locator(FixedLocator(self.geometry.voltage_ticks))
+        self.data_viewport.ax.yaxis.set_major_formatter(FixedFormatter(self.geometry.voltage_tick_labels))
+        # Spacing of the x ticks, set in `_update_image()`
+        self.img_tick_spacing = None
         # Add the color bar
-        self.data_viewport.cbar = self.data_viewport.fig.colorbar(img, ax=self.data_viewport.ax)
+        self.data_viewport.cbar = self.data_viewport.fig.colorbar(self.img, ax=self.data_viewport.ax)
         # Add the labels
         self.data_viewport.ax.set_xlabel('Scan number', fontsize=14)
         self.data_viewport.ax.set_ylabel(self.data_to_plot_x, fontsize=14)
-        self.data_viewport.cbar.ax.set_ylabel(self.data_to_plot_y, fontsize=14, rotation=270, labelpad=15)
         self.data_viewport.ax.grid(alpha=0.3, axis='y')
-        # Normalize the figure if not already normalized
-        if (self.norm_min is not None) and (self.norm_max is not None):
-            img.set_norm(plt.Normalize(vmin=self.norm_min, vmax=self.norm_max))
 
-    def _draw_lines(self, average_lines=False):
+    def _update_image(self):
         '''
-            Draws the data as one or more lines
+        Updates the data, extent, and normalization of the image drawn by `_init_image()`
         '''
-        # Proportionality requires
-        y_max = 1 + self.application.scan_parameters['n_pixels_down']/self.application.scan_parameters['n_pixels_up'] 
-        unitless_voltages = np.linspace(
-            start=0, 
-            stop=y_max, 
-            num=self.application.scan_parameters['n_pixels_down']+self.application.scan_parameters['n_pixels_up'])
-
-        # Determine the data to plot
-        if self.data_to_plot_y in self.application.data:
-            data_to_plot = self.application.data[self.data_to_plot_y]
+        # Compute the extent of the image
+        # The completed scans are a view into the preallocated buffer so no data is copied
+        n_completed_scans = self.application.n_completed_scans
+        data_to_plot = self.application.scan_buffers[self.data_to_plot_y][:n_completed_scans]
+        image_data, n_scans_shown = self._downsample_scans(data_to_plot)
+        extent = [0.5, 
+                  n_scans_shown+0.5,
+                  0,
+                  self.geometry.y_max]
+        # Relabel the color bar if the data source changed
+        if self.img_data_to_plot_y != self.data_to_plot_y:
+            self.data_viewport.cbar.ax.set_ylabel(self.data_to_plot_y, fontsize=14, rotation=270, labelpad=15)
+            self.img_data_to_plot_y = self.data_to_plot_y
+            # Reset the autoscaled limits for the new data
+            self.auto_vmin = None
+            self.auto_vmax = None
+            self.auto_n_scans = 0
+        # Update the data
+        self.img.set_data(image_data.T)
+        self.img.set_extent(extent)
+        # Set the x ticks on all integer values, or on every 5 if more than 10 scans long
+        # The locator places the ticks itself so it only needs to be replaced if the spacing changes
+        tick_spacing = 1 if (n_completed_scans < 11) else 5
+        if tick_spacing != self.img_tick_spacing:
+            self.data_viewport.ax.xaxis.set_major_locator(MultipleLocator(tick_spacing))
+            self.img_tick_spacing = tick_spacing
+        # Normalize the figure if not already normalized, otherwise autoscale to the data
+        # The color bar is subscribed to the image and updates itself via `update_normal()`
+        if (self.norm_min is not None) and (self.norm_max is not None):
+            self.img.set_clim(vmin=self.norm_min, vmax=self.norm_max)
         else:
-            # If there is no data to plot, make empty array
-            data_to_plot = [np.empty(self.application.scan_parameters['n_pixels_down']+self.application.scan_parameters['n_pixels_up']),] 
+            # Completed scans do not change so only the new scans are checked to update the limits
+            if self.auto_n_scans < n_completed_scans:
+                new_scans = data_to_plot[self.auto_n_scans:]
+                vmin = np.nanmin(new_scans)
+                vmax = np.nanmax(new_scans)
+                if self.auto_vmin is not None:
+                    vmin = min(vmin, self.auto_vmin)
+                    vmax = max(vmax, self.auto_vmax)
+                self.auto_vmin = vmin
+                self.auto_vmax = vmax
+                self.auto_n_scans = n_completed_scans
+            if self.auto_vmin is not None:
+                self.img.set_clim(vmin=self.auto_vmin, vmax=self.auto_vmax)
+
+    def _downsample_scans(self, data_to_plot: np.ndarray) -> tuple[np.ndarray, int]:
+        '''
+        Averages blocks of consecutive scans if there are more scans than display pixels across the
+        axis, since they cannot be resolved anyways. Returns the data to show and the number of
+        scans it spans, which is rounded up to a whole number of blocks.
+        '''
         n_completed_scans = len(data_to_plot)
-        if average_lines:
-            data_to_plot = [np.average(data_to_plot, axis=0),]
-        n_lines_to_plot = len(data_to_plot)
-        # Get the color map
-        colors = plt.cm.viridis(np.linspace(0,1,n_lines_to_plot))    
-        # plot the data
-        for line, c in zip(data_to_plot, colors):
-            self.data_viewport.ax.plot(
-                unitless_voltages,
-                line,
-                '-',
-                c=c
-            )    
+        width = int(self.data_viewport.ax.bbox.width)
+        if (width < 1) or (n_completed_scans <= width):
+            return data_to_plot, n_completed_scans
+        # Number of scans per block, the last block may be partially filled
+        block_size = -(-n_completed_scans // width)
+        block_starts = np.arange(0, n_completed_scans, block_size)
+        block_counts = np.minimum(block_size, n_completed_scans - block_starts)
+        image_data = np.add.reduceat(data_to_plot, block_starts, axis=0) / block_counts[:,None]
+        return image_data, len(block_starts)*block_size
+
+    def _init_lines(self):
+        '''
+        Sets up the axis for drawing the data as one or more lines. The lines themselves are
+        created and updated in place by `_update_lines()`.
+        '''
         # Set the x limits
-        self.data_viewport.ax.set_xlim(0,y_max)
+        self.data_viewport.ax.set_xlim(0,self.geometry.y_max)
         # Place the x ticks on the upsweep only
-        self.data_viewport.ax.set_xticks(
-            [0,0.25,0.5,0.75,1.0],
-            np.round(
-                np.linspace(self.application.scan_parameters['min'], 
-                            self.application.scan_parameters['max'],
-                            num = 5),
-                decimals=3)
-        )
-        # Set the y limits
-        self.data_viewport.ax.set_ylim(self.norm_min, self.norm_max)
+        self.data_viewport.ax.xaxis.set_major_locator(FixedLocator(self.geometry.voltage_ticks))
+        self.data_viewport.ax.xaxis.set_major_formatter(FixedFormatter(self.geometry.voltage_tick_labels))
         # Add the grid and title
         self.data_viewport.ax.grid(alpha=0.3)
         self.data_viewport.ax.set_xlabel(self.data_to_plot_x, fontsize=14)
-        self.data_viewport.ax.set_ylabel(self.data_to_plot_y, fontsize=14)
-        self.data_viewport.ax.set_title(f'Completed {int(n_completed_scans)} scans')
 
-    def _draw_wavemeter(self):
-        if 'upscan_wavemeter_tags' in self.application.data:
-            data_x = self.application.data['upscan_wavemeter_tags']
-            data_y = self.application.data['upscan_wavemeter_vals']
-        else:
-            data_x = np.array([0,])
-            data_y = np.array([0,])
-        
-        n_lines_to_plot = len(data_y) 
+    def _update_lines(self, average_lines=False):
+        '''
+            Draws the data as one or more lines, reusing the lines already drawn
+        '''
+        # Relabel the axis if the data source changed
+        if self.lines_data_to_plot_y != self.data_to_plot_y:
+            self.data_viewport.ax.set_ylabel(self.data_to_plot_y, fontsize=14)
+            self.lines_data_to_plot_y = self.data_to_plot_y
+        # Determine the data to plot, each line is a view of a row in the preallocated buffer
+        n_completed_scans = self.application.n_completed_scans
+        data_to_plot = self.application.scan_buffers[self.data_to_plot_y][:n_completed_scans]
+        if average_lines and (n_completed_scans > 0):
+            # Average from the running sum of the scans
+            data_to_plot = [self.application.scan_sums[self.data_to_plot_y] / n_completed_scans,]
+        n_lines_to_plot = len(data_to_plot)
+        # Add lines if there are more to plot than already drawn
+        while len(self.lines) < n_lines_to_plot:
+            self.lines += self.data_viewport.ax.plot([], [], '-')
         # Get the color map
-        colors = plt.cm.viridis(np.linspace(0,1,n_lines_to_plot))    
-        # plot the data
-        for x,y,c in zip(data_x, data_y, colors):
-            self.data_viewport.ax.plot(
-                np.array(x)-x[0],
-                np.array(y),
-                '-',
-                c=c
-            )
+        colors = self._get_line_colors(n_lines_to_plot)
+        # Update the data
+        for line, y, c in zip(self.lines, data_to_plot, colors):
+            line.set_data(self.geometry.unitless_voltages, y)
+            line.set_color(c)
+        # Set the y limits, autoscaling to the data if not normalized
+        if (self.norm_min is not None) and (self.norm_max is not None):
+            self.data_viewport.ax.set_ylim(self.norm_min, self.norm_max)
+        else:
+            self.data_viewport.ax.set_autoscaley_on(True)
+            self.data_viewport.ax.relim()
+            self.data_viewport.ax.autoscale_view(scalex=False)
+        self.data_viewport.ax.set_title(f'Completed {int(n_completed_scans)} scans')
+
+    def _get_line_colors(self, n_lines: int) -> np.ndarray:
+        '''
+        Returns the colors for plotting `n_lines` lines, caching the result for later redraws
+        '''
+        if n_lines not in self.line_colors:
+            self.line_colors[n_lines] = plt.cm.viridis(np.linspace(0,1,n_lines))
+        return self.line_colors[n_lines]
+
+    def _init_wavemeter(self):
+        '''
+        Sets up the axis with a single line collection for the wavemeter readings of all scans. The
+        lines are updated in place by `_update_wavemeter()`.
+        '''
+        self.wavemeter_lines = LineCollection([], linestyles='-')
+        self.data_viewport.ax.add_collection(self.wavemeter_lines)
         # Add the grid and title
         self.data_viewport.ax.grid(alpha=0.3)
         self.data_viewport.ax.set_xlabel('Wavemeter time tag (10 ms, per scan)', fontsize=14)
         self.data_viewport.ax.set_ylabel('Wavemeter reading (nm or GHz)', fontsize=14)
+
+    def _update_wavemeter(self):
+        '''
+        Draws the wavemeter readings of each scan relative to the first time tag of the scan
+        '''
+        if 'upscan_wavemeter_tags' in self.application.data:
+            # Readings of each scan are padded with NaN to the same length
+            n_completed_scans = self.application.n_completed_scans
+            data_x = self.application.data['upscan_wavemeter_tags'][:n_completed_scans]
+            data_y = self.application.data['upscan_wavemeter_vals'][:n_completed_scans]
+        else:
+            data_x = np.empty((0,0))
+            data_y = np.empty((0,0))
+        
+        n_lines_to_plot = len(data_y) 
+        # Stack the (x,y) points of all lines, shape (n_lines, n_points, 2)
+        segments = np.stack((data_x - data_x[:,:1], data_y), axis=-1)
+        self.wavemeter_lines.set_segments(segments)
+        self.wavemeter_lines.set_color(self._get_line_colors(n_lines_to_plot))
+        # Collections do not update the data limits so set them from the valid points
+        points = segments.reshape(-1,2)
+        points = points[np.isfinite(points).all(axis=1)]
+        if len(points) > 0:
+            self.data_viewport.ax.ignore_existing_data_limits = True
+            self.data_viewport.ax.update_datalim(points)
+            self.data_viewport.ax.autoscale_view()
         self.data_viewport.ax.set_title(f'Completed {int(n_lines_to_plot)} scans')
 
 
@@ -354,8 +513,10 @@ class ImageDataViewport:
         frame = tk.Frame(window)
         frame.pack(side=tk.LEFT, padx=0, pady=0)
 
-        self.fig = plt.figure()
-        self.ax = plt.gca()
+        # Create the figure directly instead of through pyplot so that it is only managed by the
+        # embedded tkinter canvas below
+        self.fig = Figure()
+        self.ax = self.fig.add_subplot(111)
         self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
         self.canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
@@ -403,69 +564,13 @@ class ImageFigureControlPanel:
         # Define settings frame to set all scan settings
         settings_frame = tk.Frame(frame)
         settings_frame.pack(side=tk.TOP, padx=0, pady=[10,0])
-        # Min voltage
-        row += 1
-        tk.Label(settings_frame, text="Min voltage (V)").grid(row=row, column=0)
-        self.voltage_start_entry = tk.Entry(settings_frame, width=10)
-        self.voltage_start_entry.insert(0, settings_dict['min'])
-        self.voltage_start_entry.config(state='readonly')
-        self.voltage_start_entry.grid(row=row, column=1)
-        # Max voltage
-        row += 1
-        tk.Label(settings_frame, text="Max voltage (V)").grid(row=row, column=0)
-        self.voltage_end_entry = tk.Entry(settings_frame, width=10)
-        self.voltage_end_entry.insert(0, settings_dict['max'])
-        self.voltage_end_entry.config(state='readonly')
-        self.voltage_end_entry.grid(row=row, column=1)
-        # Number of pixels on upsweep
-        row += 1
-        tk.Label(settings_frame, text="# of pixels up").grid(row=row, column=0)
-        self.num_pixels_up_entry = tk.Entry(settings_frame, width=10)
-        self.num_pixels_up_entry.insert(0, settings_dict['n_pixels_up'])
-        self.num_pixels_up_entry.config(state='readonly')
-        self.num_pixels_up_entry.grid(row=row, column=1)
-        # Number of pixels on downsweep
-        row += 1
-        tk.Label(settings_frame, text="# of pixels down").grid(row=row, column=0)
-        self.num_pixels_down_entry = tk.Entry(settings_frame, width=10)
-        self.num_pixels_down_entry.insert(0, settings_dict['n_pixels_down'])
-        self.num_pixels_down_entry.config(state='readonly')
-        self.num_pixels_down_entry.grid(row=row, column=1)
-        # Number of scans
-        row += 1
-        tk.Label(settings_frame, text="# of scans").grid(row=row, column=0)
-        self.scan_num_entry = tk.Entry(settings_frame, width=10)
-        self.scan_num_entry.insert(0, settings_dict['n_scans'])
-        self.scan_num_entry.config(state='readonly')
-        self.scan_num_entry.grid(row=row, column=1, padx=10)
-        # Time for the upsweep min -> max
-        row += 1
-        tk.Label(settings_frame, text="Upsweep time (s)").grid(row=row, column=0)
-        self.upsweep_time_entry = tk.Entry(settings_frame, width=10)
-        self.upsweep_time_entry.insert(0, settings_dict['time_up'])
-        self.upsweep_time_entry.config(state='readonly')
-        self.upsweep_time_entry.grid(row=row, column=1)
-        # Time for the downsweep max -> min
-        row += 1
-        tk.Label(settings_frame, text="Downsweep time (s)").grid(row=row, column=0)
-        self.downsweep_time_entry = tk.Entry(settings_frame, width=10)
-        self.downsweep_time_entry.insert(0, settings_dict['time_down'])
-        self.downsweep_time_entry.config(state='readonly')
-        self.downsweep_time_entry.grid(row=row, column=1, padx=10)
-        # Subpixel number
-        row += 1
-        tk.Label(settings_frame, text="# of sub-pixels").grid(row=row, column=0)
-        self.subpixel_entry = tk.Entry(settings_frame, width=10)
-        self.subpixel_entry.insert(0, settings_dict['n_subpixels'])
-        self.subpixel_entry.config(state='readonly')
-        self.subpixel_entry.grid(row=row, column=1)
-        # Repump time
-        row += 1
-        tk.Label(settings_frame, text="Reump time (s)").grid(row=row, column=0)
-        self.repump_entry = tk.Entry(settings_frame, width=10)
-        self.repump_entry.insert(0, settings_dict['time_repump'])
-        self.repump_entry.config(state='readonly')
-        self.repump_entry.grid(row=row, column=1)
+        self.settings_entries, row = _add_settings_entries(
+            settings_frame, 
+            SCAN_SETTINGS+ADVANCED_SCAN_SETTINGS, 
+            row, 
+            values=settings_dict, 
+            readonly=True
+        )
 
         # ===============================================================================
         # Add additional scan settings if implemented later
@@ -1,30 +1,85 @@
+import functools
 import importlib
 import importlib.resources
 import logging
+import os
 import numpy as np
 import datetime
-import h5py
 
+from pathlib import Path
 from threading import Thread
 import tkinter as tk
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YAMLLoader
+except ImportError:
+    from yaml import SafeLoader as _YAMLLoader
+
 import qdlutils
 from qdlutils.applications.qdlple2.application_controller import PLEControllerBase
 from qdlutils.applications.qdlple2.application_gui import (
     LauncherApplicationView,
     ScanApplicationView
 )
-import qdlutils.applications.qdlscope.main as qdlscope
 
 from typing import Union, Any
 
 logger = logging.getLogger(__name__)
-logging.basicConfig()
 
 CONFIG_PATH = 'qdlutils.applications.qdlple2.config_files'
 DEFAULT_CONFIG_FILE = 'qdlple2_base.yaml'
 
+# Controller parameters listing the hardware groups to load as inputs/outputs
+IO_GROUP_CATEGORIES = ('scan_inputs', 'scan_outputs', 'repump_inputs', 'repump_outputs')
+
+# Scan configuration entries in the launcher control panel and the types they are read as
+SCAN_ENTRY_TYPES = (
+    ('min', float),
+    ('max', float),
+    ('n_pixels_up', int),
+    ('n_pixels_down', int),
+    ('n_subpixels', int),
+    ('time_up', float),
+    ('time_down', float),
+    ('time_repump', float),
+)
+# Keys of the GUI input which configure the scan sequence
+SCAN_CONFIG_KEYS = tuple(key for key, _ in SCAN_ENTRY_TYPES) + ('pump_on',)
+
+@functools.lru_cache(maxsize=None)
+def _import_class(import_path: str, class_name: str) -> type:
+    '''
+    Imports the module at `import_path` and returns its class `class_name`. The result is cached so
+    that classes shared by multiple hardware groups or launches are only resolved once.
+    '''
+    logger.debug(f'Importing {class_name} from {import_path}')
+    return getattr(importlib.import_module(import_path), class_name)
+
+def _load_config(yaml_filename: str) -> dict[str,Any]:
+    '''
+    Loads the YAML file `yaml_filename` in the config directory as a nested dict. The parsed config
+    is cached and shared between launches so it must not be modified. Files edited since their last
+    load are parsed again.
+    '''
+    # Get the full path for the YAML file
+    yaml_path = importlib.resources.files(CONFIG_PATH).joinpath(yaml_filename)
+    return _parse_config(yaml_path, os.stat(yaml_path).st_mtime_ns)
+
+@functools.lru_cache(maxsize=32)
+def _parse_config(yaml_path: Path, mtime: int) -> dict[str,Any]:
+    '''
+    Parses the YAML file at `yaml_path`. The modification time `mtime` is only used as part of the
+    cache key so that edited files are not served from the cache.
+    '''
+    # Safe load the file into the `config` dict
+    with yaml_path.open('rb') as file:
+        # Log selection
+        logger.info(f"Loading settings from: {yaml_path}")
+        # Get the YAML config as a nested dict
+        return yaml.load(file, Loader=_YAMLLoader)
+
 class LauncherApplication:
 
     # Type hints
@@ -77,8 +132,8 @@ class LauncherApplication:
         self.view = LauncherApplicationView(main_window=self.root)
 
         # Bind the GUI buttons to callback functions
-        self.view.control_panel.start_button.bind("<Button>", self.start_scan)
-        self.view.control_panel.goto_button.bind("<Button>", self.set_laser)
+        self.view.control_panel.start_button.config(command=self.start_scan)
+        self.view.control_panel.goto_button.config(command=self.set_laser)
         self.view.control_panel.repump_laser_toggle.config(command=self.toggle_repump_laser)
         self.view.control_panel.scan_laser_toggle.config(command=self.toggle_scan_laser)
         self.view.control_panel.pump_laser_toggle.config(command=self.toggle_pump_laser)
@@ -108,81 +163,42 @@ class LauncherApplication:
         Opens the YAML file, extracts configuration data and loads the appropriate classes.
         '''
 
-        # Get the full path for the YAML file
-        yaml_path = importlib.resources.files(CONFIG_PATH).joinpath(yaml_filename)
-        # Safe load the file into the `config` dict
-        with open(str(yaml_path), 'r') as file:
-            # Log selection
-            logger.info(f"Loading settings from: {yaml_path}")
-            # Get the YAML config as a nested dict
-            config = yaml.safe_load(file)
+        # Get the YAML config as a nested dict, only parsed on the first load of the file
+        config = _load_config(yaml_filename)
 
         # Get top level
-        app_name = list(config.keys())[0]
+        app_config = config[next(iter(config))]
 
         # Get the config of the application controller
-        controller_config = config[app_name]['ApplicationController']
+        controller_config = app_config['ApplicationController']
         # Get the config of the hardware groups
-        hardware_config = config[app_name]['HardwareGroups']
+        hardware_config = app_config['HardwareGroups']
         # Get the config of the channels
-        channel_config = config[app_name]['Channels']
+        channel_config = app_config['Channels']
         # Get the config of the non-daq devices
-        nondaq_config = config[app_name]['NonDAQDevices']
+        nondaq_config = app_config['NonDAQDevices']
 
         # First get the application controller class path/name and generate a constructor
-        ctrl_import_path = controller_config['import_path']
-        ctrl_class_name = controller_config['class_name']
-        module = importlib.import_module(ctrl_import_path)
-        logger.debug(f'Importing {ctrl_import_path}')
-        constructor = getattr(module, ctrl_class_name)
-        # Load the controller input parameters
-        ctrl_params = controller_config['configure']
-
-        # Load the scan inputs
-        scan_inputs, scan_inputs_instr = self._load_io_groups(
-            groups_to_load=ctrl_params['scan_inputs'],
-            hardware_config=hardware_config,
-            channel_config=channel_config
-        )
-        # Load the scan outputs
-        scan_outputs, scan_outputs_instr = self._load_io_groups(
-            groups_to_load=ctrl_params['scan_outputs'],
+        constructor = _import_class(controller_config['import_path'], controller_config['class_name'])
+        # Load the controller input parameters, copied since the loaded config is shared
+        ctrl_params = dict(controller_config['configure'])
+
+        # Load the scan and repump input/output groups and replace their names in the controller
+        # parameters with the constructed groups
+        io_groups, ctrl_params['process_instructions'] = self._load_io_groups(
+            categories={category: ctrl_params[category] for category in IO_GROUP_CATEGORIES},
             hardware_config=hardware_config,
             channel_config=channel_config
         )
-        # Load the repump inputs
-        repump_inputs, repump_inputs_instr = self._load_io_groups(
-            groups_to_load=ctrl_params['repump_inputs'],
-            hardware_config=hardware_config,
-            channel_config=channel_config
-        )
-        # Load the repump outputs
-        repump_outputs, repump_outputs_instr = self._load_io_groups(
-            groups_to_load=ctrl_params['repump_outputs'],
-            hardware_config=hardware_config,
-            channel_config=channel_config
-        )
-
-        # Add/update the controller parameters
-        ctrl_params['scan_inputs'] = scan_inputs
-        ctrl_params['scan_outputs'] = scan_outputs
-        ctrl_params['repump_inputs'] = repump_inputs
-        ctrl_params['repump_outputs'] = repump_outputs
-        ctrl_params['process_instructions'] = {
-            **scan_inputs_instr, **scan_outputs_instr, **repump_inputs_instr, **repump_outputs_instr
-        }
+        ctrl_params |= io_groups
 
         # Load the non-daq devices
         nondaq_device_names = ctrl_params['nondaq_devices']
         for dev in nondaq_device_names:
             # Get the device config information
-            path = nondaq_config[dev]['import_path']
-            cls = nondaq_config[dev]['class_name']
             config =nondaq_config[dev]['config']
             # Import and get the constructor for the class
-            module = importlib.import_module(path)
-            logger.debug(f'Importing {cls}')
-            dev_constructor = getattr(module, cls)
+            dev_constructor = _import_class(nondaq_config[dev]['import_path'], nondaq_config[dev]['class_name'])
             # Create the class and add it to the controller parameters dictionary
             ctrl_params[dev] = dev_constructor(**config)
 
@@ -190,56 +206,65 @@ class LauncherApplication:
         self.application_controller = constructor(**ctrl_params)
 
         # Save the scan input channel names to the application
-        for group in scan_inputs.values():
-            self.scan_input_channels += group.channel_names
+        self.scan_input_channels = [
+            name for group in io_groups['scan_inputs'].values() for name in group.channel_names
+        ]
         
     def _load_io_groups(
             self,
-            groups_to_load: dict[str,Any],
+            categories: dict[str,list[str]],
             hardware_config: dict[str,Any],
             channel_config: dict[str,Any]
     ):
         '''
-        Creates dictionary of input/output groups specified by the controller YAML configuration
+        Creates dictionaries of input/output groups specified by the controller YAML configuration
+        for each input/output category in a single pass.
 
         Parameters
         ----------
-        name: str
-            Name of the inputs/outputs to load
+        categories: dict[str,list[str]]
+            Names of the hardware groups to load for each controller input/output parameter, e.g.
+            `'scan_inputs'`.
+        hardware_config: dict[str,Any]
+            Configuration of the hardware groups.
+        channel_config: dict[str,Any]
+            Configuration of the channels.
 
         Returns
         -------
-        groups: dict[str,dict[str,Any]]
-            A dictionary of the input/output groups associated to the controller parameter specified
-            by the `name`.
+        io_groups: dict[str,dict[str,Any]]
+            A dictionary of the input/output groups for each category in `categories`. Groups listed
+            in several categories are constructed separately for each, since the scan and repump 
+            sequencers configure their own tasks from them.
         process_instructions: dict[str,str]
-            Process instructions for the channels in the loaded groups
+            Process instructions for the channels in all of the loaded groups
         '''
         # Dictionaries to hold the io groups and process instructions 
-        groups = {}
+        io_groups = {}
         process_instructions = {}
-        # Iterate through the groups, construct them and then save them in the `groups` dict.
-        for group in groups_to_load:
-            # Get the group configuration dictionary
-            group_dict = hardware_config[group]
-            # Get the path and class name, make the constructor
-            group_import_path = group_dict['import_path']
-            group_class_name = group_dict['class_name']
-            module = importlib.import_module(group_import_path)
-            logger.debug(f'Importing {group_import_path}')
-            group_constructor = getattr(module, group_class_name)
-            # Get the channels. This is a dicitonary where each key-value pair describes a channel 
-            # in the group and it's corresponding configuration information.
-            channels = {}
-            for channel in group_dict['channels']:
-                # Get the channel config dict
-                channels[channel] = channel_config[channel]
-                if channel_config[channel]['process_instructions'] is not None:
-                    process_instructions[channel] = channel_config[channel]['process_instructions']
-            # Add groups to output dictionary
-            groups[group] = group_constructor(channels_config = channels)
-
-        return groups, process_instructions
+        for category, groups_to_load in categories.items():
+            # Iterate through the groups, construct them and then save them in the `groups` dict.
+            groups = {}
+            for group in groups_to_load:
+                # Get the group configuration dictionary
+                group_dict = hardware_config[group]
+                # Get the constructor from the path and class name
+                group_constructor = _import_class(group_dict['import_path'], group_dict['class_name'])
+                # Get the channels. This is a dicitonary where each key-value pair describes a 
+                # channel in the group and it's corresponding configuration information.
+                channels = {}
+                for channel in group_dict['channels']:
+                    # Get the channel config dict
+                    config = channel_config[channel]
+                    channels[channel] = config
+                    instruction = config['process_instructions']
+                    if instruction is not None:
+                        process_instructions[channel] = instruction
+                # Add groups to output dictionary
+                groups[group] = group_constructor(channels_config = channels)
+            io_groups[category] = groups
+
+        return io_groups, process_instructions
 
     def set_laser(
             self,
@@ -265,6 +290,28 @@ class LauncherApplication:
         except Exception as e:
             logger.error(f'Error with setting laser: {e}')
 
+    def _toggle_laser(
+            self,
+            name: str,
+            output_id: str,
+            toggle: tk.IntVar,
+            set_value: bool = None
+    ) -> None:
+        '''
+        Sets the output `output_id` of the laser `name` from the state of its GUI `toggle`. The GUI
+        state is read once per call and takes precedence; `set_value` is used when it is neither on
+        nor off.
+        '''
+        toggle_state = toggle.get()
+        # If the GUI toggle is on OR if the direct command is True then turn on the laser
+        if (toggle_state == 1) or (set_value is True):
+            logger.info(f'Turning {name} laser on.')
+            self.application_controller.set_output(output_id=output_id, setpoint=True)
+        # Else if the GUI toggle is off OR if the direct command is False then turn off the laser
+        elif (toggle_state == 0) or (set_value is False):
+            logger.info(f'Turning {name} laser off.')
+            self.application_controller.set_output(output_id=output_id, setpoint=False)
+
     def toggle_repump_laser(
             self, 
             set_value: bool = None
@@ -273,24 +320,13 @@ class LauncherApplication:
         Callback to toggle the repump laser. If called outside of a callback function, the parameter
         `set_value` determines the toggled state, independent of the GUI.
         '''
-
         try: 
-            # If the GUI toggle is on and no direct command `cmd` given
-            # OR if the direct command is True then turn on the laser
-            if (self.view.control_panel.repump_laser_on.get() == 1) or (set_value is True):
-                logger.info('Turning repump laser on.')
-                self.application_controller.set_output(
-                    output_id=self.application_controller.repump_laser_id, 
-                    setpoint=True
-                )
-            # Else if the GUI toggle is off and no direct command is given
-            # OR if the direct command is False then turn off the laser
-            elif (self.view.control_panel.repump_laser_on.get() == 0) or (set_value is False):
-                logger.info('Turning repump laser off.')
-                self.application_controller.set_output(
-                    output_id=self.application_controller.repump_laser_id, 
-                    setpoint=False
-                )
+            self._toggle_laser(
+                'repump',
+                self.application_controller.repump_laser_id,
+                self.view.control_panel.repump_laser_on,
+                set_value
+            )
         except Exception as e:
             logger.error(f'Repump laser could not be toggled: {e}')
 
@@ -302,24 +338,13 @@ class LauncherApplication:
         Callback to toggle the scan laser. If called outside of a callback function, the parameter
         `set_value` determines the toggled state, independent of the GUI.
         '''
-
         try: 
-            # If the GUI toggle is on and no direct command `cmd` given
-            # OR if the direct command is True then turn on the laser
-            if (self.view.control_panel.scan_laser_on.get() == 1) or (set_value is True):
-                logger.info('Turning scan laser on.')
-                self.application_controller.set_output(
-                    output_id=self.application_controller.scan_laser_switch_id, 
-                    setpoint=True
-                )
-            # Else if the GUI toggle is off and no direct command is given
-            # OR if the direct command is False then turn off the laser
-            elif (self.view.control_panel.scan_laser_on.get() == 0) or (set_value is False):
-                logger.info('Turning scan laser off.')
-                self.application_controller.set_output(
-                    output_id=self.application_controller.scan_laser_switch_id, 
-                    setpoint=False
-                )
+            self._toggle_laser(
+                'scan',
+                self.application_controller.scan_laser_switch_id,
+                self.view.control_panel.scan_laser_on,
+                set_value
+            )
         except Exception as e:
             logger.error(f'Scan laser could not be toggled: {e}')
 
@@ -328,72 +353,38 @@ class LauncherApplication:
             set_value: bool = None
     ) -> None:
         '''
-        Callback to toggle the scan laser. If called outside of a callback function, the parameter
+        Callback to toggle the pump laser. If called outside of a callback function, the parameter
         `set_value` determines the toggled state, independent of the GUI.
         '''
-
         try: 
-            # If the GUI toggle is on and no direct command `cmd` given
-            # OR if the direct command is True then turn on the laser
-            if (self.view.control_panel.pump_laser_on.get() == 1) or (set_value is True):
-                logger.info('Turning pump laser on.')
-                self.application_controller.set_output(
-                    output_id=self.application_controller.pump_laser_id, 
-                    setpoint=True
-                )
-            # Else if the GUI toggle is off and no direct command is given
-            # OR if the direct command is False then turn off the laser
-            elif (self.view.control_panel.pump_laser_on.get() == 0) or (set_value is False):
-                logger.info('Turning pump laser off.')
-                self.application_controller.set_output(
-                    output_id=self.application_controller.pump_laser_id, 
-                    setpoint=False
-                )
+            self._toggle_laser(
+                'pump',
+                self.application_controller.pump_laser_id,
+                self.view.control_panel.pump_laser_on,
+                set_value
+            )
         except Exception as e:
             logger.error(f'Pump laser could not be toggled: {e}')
 
     def _read_gui(
             self
-    ) -> None:
+    ) -> dict[str,Any]:
         '''
         Reads the current input from the GUI and saves data to `self.gui_input`. Returns the scan
         configuration dictionary
         '''
 
-        # Read the values from the GUI
-        min = float(self.view.control_panel.voltage_start_entry.get())
-        max = float(self.view.control_panel.voltage_end_entry.get())
-        n_pixels_up = int(self.view.control_panel.num_pixels_up_entry.get())
-        n_pixels_down = int(self.view.control_panel.num_pixels_down_entry.get())
-        n_subpixels = int(self.view.control_panel.subpixel_entry.get())
-        time_up = float(self.view.control_panel.upsweep_time_entry.get())
-        time_down = float(self.view.control_panel.downsweep_time_entry.get())
-        time_repump = float(self.view.control_panel.repump_entry.get())
-        n_scans = int(self.view.control_panel.scan_num_entry.get())
-        laser_setpoint = float(self.view.control_panel.laser_setpoint.get())
-        pump_on = bool(self.view.control_panel.pump_laser_on.get())
-
-        # Get the scan configuration parameters
-        scan_config_params = {
-            'min' : min,
-            'max' : max,
-            'n_pixels_up' : n_pixels_up,
-            'n_pixels_down' :  n_pixels_down,
-            'n_subpixels' : n_subpixels,
-            'time_up' : time_up,
-            'time_down' : time_down,
-            'time_repump' : time_repump,
-            'pump_on' : pump_on
-        }
+        control_panel = self.view.control_panel
+        entries = control_panel.settings_entries
 
         # Set the GUI input
-        self.gui_input = {
-            **scan_config_params,
-            'n_scans' : n_scans,
-            'laser_setpoint' : laser_setpoint
-        }
+        self.gui_input = {key: dtype(entries[key].get()) for key, dtype in SCAN_ENTRY_TYPES}
+        self.gui_input['pump_on'] = bool(control_panel.pump_laser_on.get())
+        self.gui_input['n_scans'] = int(entries['n_scans'].get())
+        self.gui_input['laser_setpoint'] = float(control_panel.laser_setpoint.get())
 
-        return scan_config_params
+        # Get the scan configuration parameters
+        return {key: self.gui_input[key] for key in SCAN_CONFIG_KEYS}
 
     def start_scan(
             self,
@@ -443,8 +434,22 @@ class ScanApplication:
         self.id = id
         self.timestamp = datetime.datetime.now()
 
-        # Create a dictionary to store the data
+        # Create a dictionary to store the data, each entry is an array holding all of the scans
+        # which is allocated on the first scan. Only the first `n_completed_scans` are valid.
         self.data = {}
+        # Preallocate buffers for the plotted data of each input source. Each completed scan is
+        # written into the next row so that the view can plot the buffer without copying the data.
+        # Single precision is sufficient for plotting, the full precision data is kept in `data`.
+        n_pixels = scan_parameters['n_pixels_up'] + scan_parameters['n_pixels_down']
+        self.scan_buffers = {
+            name: np.empty((n_scans, n_pixels), dtype=np.float32) 
+            for name in parent_application.scan_input_channels
+        }
+        self.n_completed_scans = 0
+        # Running sum of the scans for each input source to compute the average
+        self.scan_sums = {
+            name: np.zeros(n_pixels) for name in parent_application.scan_input_channels
+        }
 
         # Configure the sequencer, an error will be thrown 
         self.application_controller.configure_sequence(
@@ -461,17 +466,17 @@ class ScanApplication:
         )
 
         # Bind the buttons
-        self.view.control_panel.stop_button.bind("<Button>", self.stop_scan)
-        self.view.control_panel.save_button.bind("<Button>", self.save_scan)
-        self.view.control_panel.norm_button.bind("<Button>", self.set_normalize)
-        self.view.control_panel.autonorm_button.bind("<Button>", self.auto_normalize)
+        self.view.control_panel.stop_button.config(command=self.stop_scan)
+        self.view.control_panel.save_button.config(command=self.save_scan)
+        self.view.control_panel.norm_button.config(command=self.set_normalize)
+        self.view.control_panel.autonorm_button.config(command=self.auto_normalize)
 
         # Bind the variables to update when changed
         self.view.control_panel.selected_option.trace_add(mode='write', callback=self.update_data_to_plot)
         self.view.control_panel.format_option.trace_add(mode='write', callback=self.update_plot_format)
 
-        # Launch the thread
-        self.scan_thread = Thread(target=self.scan_thread_function)
+        # Launch the thread, daemonized so that an unfinished scan does not keep the process alive
+        self.scan_thread = Thread(target=self.scan_thread_function, daemon=True)
         self.scan_thread.start()
 
     def scan_thread_function(self) -> None:
@@ -486,17 +491,25 @@ class ScanApplication:
                 # Each yield gets new `scan_data` which is a dictionary with all the entires defined
                 # in `PLEController.process_data()`. We will generally not know what these are ahead
                 # of time and so we must programatically define them.
-                # The first time we need to just save the data directly, here using a dictionary
-                # comprehension to place the values in lists:
-                if self.data == {}:
-                    self.data = {k: [v,] for k,v in scan_data.items()}
-                # On the later scans we can simply append
-                else:
-                    for result in scan_data:
-                        self.data[result].append(scan_data[result])
-                    
-                # Update the figure
-                self.view.update_figure()
+                # The first time we allocate an array for each entry with space for all of the scans
+                # using the shape and type of the first scan:
+                if self.n_completed_scans == 0:
+                    self.data = {
+                        k: np.empty((self.n_scans,)+np.shape(v), dtype=np.asarray(v).dtype) 
+                        for k,v in scan_data.items()
+                    }
+                # Then write the scan into the next row
+                for result, value in scan_data.items():
+                    self.data[result][self.n_completed_scans] = value
+
+                # Write the scan into the plotting buffers
+                for name, buffer in self.scan_buffers.items():
+                    buffer[self.n_completed_scans] = scan_data[name]
+                    self.scan_sums[name] += scan_data[name]
+                self.n_completed_scans += 1
+
+                # Request an update of the figure, drawn on the tkinter main loop
+                self.view.request_update()
 
                 logger.info(f'Scan {scan_num:d} complete.')
                 scan_num += 1
@@ -550,24 +563,21 @@ class ScanApplication:
             return # selection was canceled.
 
         # Get the path
-        file_path = '/'.join(afile.split('/')[:-1])  + '/'
-        self.parent_application.last_save_directory = file_path # Save the last used file path
-        logger.info(f'Saving files to directory: {file_path}')
-        # Get the name with extension (will be overwritten)
-        file_name = afile.split('/')[-1]
-        # Get the filetype
-        file_type = file_name.split('.')[-1]
+        afile = Path(afile)
+        self.parent_application.last_save_directory = str(afile.parent) # Save the last used file path
+        logger.info(f'Saving files to directory: {afile.parent}')
         # Get the filename without extension
-        file_name = '.'.join(file_name.split('.')[:-1]) # Gets everything but the extension
+        file_name = afile.stem
 
         # If the file type is .png, want to save image and hdf5
-        if file_type == 'png':
+        if afile.suffix == '.png':
             logger.info(f'Saving the PNG as {file_name}.png')
             fig = self.view.data_viewport.fig
-            fig.savefig(file_path+file_name+'.png', dpi=300, bbox_inches=None, pad_inches=0)
+            fig.savefig(afile, dpi=300, bbox_inches=None, pad_inches=0)
 
-        # Save as hdf5
-        with h5py.File(file_path+file_name+'.hdf5', 'w') as df:
+        # Save as hdf5, h5py is only imported here since it is not needed otherwise
+        import h5py
+        with h5py.File(afile.with_suffix('.hdf5'), 'w') as df:
             
             logger.info(f'Saving the HDF5 as {file_name}.hdf5')
             
@@ -578,22 +588,27 @@ class ScanApplication:
                                                   'scan_id', 
                                                   'timestamp', 
                                                   'original_name'], dtype='S'))
-            ds.attrs['application'] = 'qdlutils.qdlscan.ImageScanApplication'
-            ds.attrs['qdlutils_version'] = qdlutils.__version__
-            ds.attrs['scan_id'] = self.id
-            ds.attrs['timestamp'] = self.timestamp.strftime('%Y-%m-%d %H:%M:%S')
-            ds.attrs['original_name'] = file_name
+            ds.attrs.update({
+                'application': 'qdlutils.qdlscan.ImageScanApplication',
+                'qdlutils_version': qdlutils.__version__,
+                'scan_id': self.id,
+                'timestamp': self.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+                'original_name': file_name,
+            })
 
             # Save the scan settings
-            # Run through the scan parameters dictionary saving data 
+            # The scan parameters are saved as attributes of an empty dataset
             ds = df.create_dataset('scan_parameters', data=np.array([]))
-            for param, val in self.scan_parameters.items():
-                ds.attrs[param] =  val
-            ds.attrs['n_scans'] = self.n_scans
+            ds.attrs.update({**self.scan_parameters, 'n_scans': self.n_scans})
 
-            # Save the data
+            # Save the data of the completed scans, compressed since raw sub-pixel data is large
             for source, data in self.data.items():
-                df.create_dataset(name=source, data=data)
+                df.create_dataset(
+                    name=source, 
+                    data=data[:self.n_completed_scans], 
+                    compression='gzip', 
+                    shuffle=True
+                )
 
     def set_normalize(
             self,
@@ -658,6 +673,10 @@ class ScanApplication:
 
 
 def main(is_root_process=True):
+    # Configure logging when launched rather than on import, leaving library users' config alone.
+    # The package logger is set to INFO so that scan progress is shown when launched from qdlhome.
+    logging.basicConfig()
+    logging.getLogger('qdlutils.applications.qdlple2').setLevel(logging.INFO)
     tkapp = LauncherApplication(
         default_config_filename=DEFAULT_CONFIG_FILE,
         is_root_process=is_root_process)
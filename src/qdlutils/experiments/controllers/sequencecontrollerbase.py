@@ -6,6 +6,7 @@ from qdlutils.hardware.nidaq.synchronous.nidaqsequencerinputgroup import NidaqSe
 from qdlutils.hardware.nidaq.synchronous.nidaqsequenceroutputgroup import NidaqSequencerOutputGroup
 
 from typing import Union, Any, Callable
+from threading import Lock
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
@@ -111,8 +112,15 @@ class SequenceControllerBase:
         self.timeout = None
 
         # Control attributes
-        self.busy = False       # True if currently executing an action
-        self.stop = False       # Set to `True` externally if controller should stop
+        self._busy_lock = Lock()    # Held while executing an action, see `busy`
+        self.stop = False           # Set to `True` externally if controller should stop
+
+    @property
+    def busy(self) -> bool:
+        '''
+        `True` if the controller is currently executing an action.
+        '''
+        return self._busy_lock.locked()
 
     def configure_sequence(
             self,
@@ -156,7 +164,7 @@ class SequenceControllerBase:
     def _run_sequence(
             self,
             process_method: Callable = None,
-            process_kwargs: dict = {}
+            process_kwargs: dict = None
     ) -> Union[dict[str,np.ndarray], Any]:
         '''
         Runs a single sequence utilizing the currently stored sequencer and associated class 
@@ -172,8 +180,8 @@ class SequenceControllerBase:
             A function which processes the data. The first argument must accept the source data in
             the form of `dict[str,np.ndarray]`. There are no restrictions on the return type of this
             method.
-        **process_kwargs
-            Keyword arguments for the `process_method()` function.
+        process_kwargs: dict = None
+            Keyword arguments for the `process_method()` function, if any.
 
         Returns
         -------
@@ -198,13 +206,13 @@ class SequenceControllerBase:
             return self.sequencer.get_data()
         else:
             # Otherwise return the processed data
-            return process_method(self.sequencer.get_data(), **process_kwargs)
+            return process_method(self.sequencer.get_data(), **(process_kwargs or {}))
     
     def run_n_sequences(
             self,
             n: int,
             process_method: Callable = None,
-            process_kwargs: dict = {}
+            process_kwargs: dict = None
     ):
         '''
         This method runs `n` sequences with the current configureation, handling interruptions for 
@@ -219,8 +227,8 @@ class SequenceControllerBase:
             the form of `dict[str,np.ndarray]`. There are no restrictions on the return type of this
             method. For convenience, the class method `process_data()` can be modified for this;
             otherwise, an external function can be supplied.
-        **process_kwargs
-            Keyword arguments for the `process_method()` function.
+        process_kwargs: dict = None
+            Keyword arguments for the `process_method()` function, if any.
 
         Yields
         ------
@@ -249,24 +257,22 @@ class SequenceControllerBase:
         managed by supplying the `process_method`.
         '''
 
-        # Block action if busy
-        if self.busy:
+        # Reserve the controller, blocking action if busy
+        if not self._busy_lock.acquire(blocking=False):
             raise RuntimeError('Application controller is currently in use.')
 
-        # Reserve the controller
-        self.busy=True
-
-        for i in range(n):
-            # Run a single sequence and yield the data
-            yield self._run_sequence(process_method=process_method,process_kwargs=process_kwargs)
-            # Check if the software has requested to stop; exit if true.
-            if self.stop:
-                logger.info('Stopping sequence.')
-                break
-
-        # Release controller
-        self.busy=False
-        self.stop=False
+        try:
+            for i in range(n):
+                # Run a single sequence and yield the data
+                yield self._run_sequence(process_method=process_method,process_kwargs=process_kwargs)
+                # Check if the software has requested to stop; exit if true.
+                if self.stop:
+                    logger.info('Stopping sequence.')
+                    break
+        finally:
+            # Release controller, also if the sequence failed or the generator was closed early
+            self._busy_lock.release()
+            self.stop=False
         logger.info('Completed sequence.')
 
 
@@ -278,18 +284,15 @@ class SequenceControllerBase:
         '''
         Sets the output of the controller specified by `output_id` to the `setpoint`.
         '''
-        # Block action if busy
-        if self.busy:
+        # Reserve the controller, blocking action if busy
+        if not self._busy_lock.acquire(blocking=False):
             raise RuntimeError('Controller is currently in use.')
-        # Reserve the controller
-        self.busy=True
         # Attempt to set the value of the specified output to the set point
         try:
             self.sequencer.set_output(output_name = output_id, setpoint=setpoint)
-        except Exception as e:
-            raise e
-        # Release the controller
-        self.busy=False
+        finally:
+            # Release the controller
+            self._busy_lock.release()
 
     def process_data(
             self,
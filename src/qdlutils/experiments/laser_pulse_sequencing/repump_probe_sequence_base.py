@@ -505,7 +505,8 @@ class RepumpProbeSequenceBase(SequenceControllerBase):
         # Open the wavemeter
         self.wavemeter_controller.open()
 
-        errors = []
+        # Number of consecutive readings within tolerance
+        n_in_tol = 0
         current_penalty = 1
         for i in range(max_attempts):
 
@@ -514,11 +515,11 @@ class RepumpProbeSequenceBase(SequenceControllerBase):
                 time_tag, reading = self.wavemeter_controller.readout()
                 # Compute the error
                 error = self.probe_target - reading
-                # Save the error
-                errors.append( error )
+                # Count the consecutive readings in tolerance
+                n_in_tol = n_in_tol + 1 if abs(error) < tol else 0
                 print(f'Target = {self.probe_target:.4f}, Actual = {reading:.4f}, error = {error:.4f}.')
                 # Check if success condition achieved
-                if i > hold_window and all(abs(e) < tol for e in errors[-hold_window:]):
+                if n_in_tol >= hold_window:
                     print('Laser converged to desired value.')
                     # Close the wavemeter
                     self.wavemeter_controller.close()
@@ -623,11 +624,15 @@ class RepumpProbeSequenceBase(SequenceControllerBase):
         # Set the sequence parameters
         self.single_sequence_time = np.arange(self.single_sequence_n_samples) / clock_rate
         n_samples = self.n_repetitions * self.single_sequence_n_samples
-        self.output_data = {
+        # The repeated sequence is the same for every batch so it is only tiled once
+        sequence_output_data = {
             self.repump_id        : np.tile(self.single_sequence_repump_data, self.n_repetitions), # Repeats sequence
             self.probe_id         : np.tile(self.single_sequence_probe_data, self.n_repetitions),
             self.probe_id+'_freq' : None # Add this after stabiliztaion
         }
+        # Probe voltage output, filled with the stabilized voltage before each batch
+        probe_freq_data = np.empty(n_samples)
+        self.output_data = sequence_output_data
         self.input_samples = {
             self.counter_id : n_samples
         }
@@ -655,11 +660,7 @@ class RepumpProbeSequenceBase(SequenceControllerBase):
                 self.single_probe_scan(**scan_kwargs)
                 # Reset the sequence parameters
                 self.clock_rate = clock_rate
-                self.output_data = {
-                    self.repump_id        : np.tile(self.single_sequence_repump_data, self.n_repetitions), # Repeats sequence
-                    self.probe_id         : np.tile(self.single_sequence_probe_data, self.n_repetitions),
-                    self.probe_id+'_freq' : None # Add this after stabiliztaion
-                }
+                self.output_data = sequence_output_data
                 self.input_samples = {
                     self.counter_id : n_samples
                 }
@@ -674,7 +675,8 @@ class RepumpProbeSequenceBase(SequenceControllerBase):
             # Record the probe target value
             self.batch_probe_targets.append(self.probe_target)
             # Write the stabilized voltage to the output
-            self.output_data[self.probe_id+'_freq'] = np.ones(n_samples) * self.probe_voltage
+            probe_freq_data.fill(self.probe_voltage)
+            self.output_data[self.probe_id+'_freq'] = probe_freq_data
             # Run a single sequence
             data = self._run_sequence(process_method=self.process_sequence_data)
             # Store the batched data 
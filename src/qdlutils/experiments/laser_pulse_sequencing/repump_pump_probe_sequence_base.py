@@ -206,12 +206,16 @@ class RepumpPumpProbeSequenceBase(RepumpProbeSequenceBase):
         # Set the sequence parameters
         self.single_sequence_time = np.arange(self.single_sequence_n_samples) / clock_rate
         n_samples = self.n_repetitions * self.single_sequence_n_samples
-        self.output_data = {
+        # The repeated sequence is the same for every batch so it is only tiled once
+        sequence_output_data = {
             self.repump_id        : np.tile(self.single_sequence_repump_data, self.n_repetitions), # Repeats sequence
             self.probe_id         : np.tile(self.single_sequence_probe_data, self.n_repetitions),
             self.pump_id          : np.tile(self.single_sequence_pump_data, self.n_repetitions),
             self.probe_id+'_freq' : None # Add this after stabiliztaion
         }
+        # Probe voltage output, filled with the stabilized voltage before each batch
+        probe_freq_data = np.empty(n_samples)
+        self.output_data = sequence_output_data
         self.input_samples = {
             self.counter_id : n_samples
         }
@@ -239,11 +243,7 @@ class RepumpPumpProbeSequenceBase(RepumpProbeSequenceBase):
                 self.single_probe_scan(**scan_kwargs)
                 # Reset the sequence parameters
                 self.clock_rate = clock_rate
-                self.output_data = {
-                    self.repump_id        : np.tile(self.single_sequence_repump_data, self.n_repetitions), # Repeats sequence
-                    self.probe_id         : np.tile(self.single_sequence_probe_data, self.n_repetitions),
-                    self.probe_id+'_freq' : None # Add this after stabiliztaion
-                }
+                self.output_data = sequence_output_data
                 self.input_samples = {
                     self.counter_id : n_samples
                 }
@@ -258,7 +258,8 @@ class RepumpPumpProbeSequenceBase(RepumpProbeSequenceBase):
             # Record the probe target value
             self.batch_probe_targets.append(self.probe_target)
             # Write the stabilized voltage to the output
-            self.output_data[self.probe_id+'_freq'] = np.ones(n_samples) * self.probe_voltage
+            probe_freq_data.fill(self.probe_voltage)
+            self.output_data[self.probe_id+'_freq'] = probe_freq_data
             # Run a single sequence
             data = self._run_sequence(process_method=self.process_sequence_data)
             # Store the batched data 